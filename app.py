@@ -1,7 +1,9 @@
+import importlib
+
 import streamlit as st
-from app_pages import home, mess_reviews, events, news
 from components.auth import simple_auth
-from components.ui import load_css, render_header
+from components.ui import load_css, navigate, render_header
+from utils.data_service import get_data_manager
 
 # Page config
 st.set_page_config(
@@ -11,12 +13,33 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Page modules by navigation key. Each is imported the first time it is
+# routed to, so the landing and login screens never load pandas or plotly.
+PAGES = {
+    'home': 'app_pages.home',
+    'mess': 'app_pages.mess_reviews',
+    'events': 'app_pages.events',
+    'news': 'app_pages.news',
+    'diagnostics': 'app_pages.diagnostics',
+}
+
+def load_page(name):
+    """The module for a page key (home for unknown keys), imported on first use"""
+    return importlib.import_module(PAGES.get(name, PAGES['home']))
+
+def logout():
+    st.session_state.authenticated = False
+    st.session_state.current_page = 'home'
+
 def main():
     # Load CSS
     load_css()
     
+    # One data manager per process, shared by every session and page
+    dm = get_data_manager()
+    
     # Simple authentication
-    if not simple_auth():
+    if not simple_auth(dm):
         return
     
     # Header
@@ -33,46 +56,27 @@ def main():
         if 'current_page' not in st.session_state:
             st.session_state.current_page = 'home'
         
-        # Navigation buttons with unique keys
-        if st.button("🏠 Home", key="nav_home", use_container_width=True):
-            st.session_state.current_page = 'home'
-            st.rerun()
-        
-        if st.button("🍽️ Mess Reviews", key="nav_mess", use_container_width=True):
-            st.session_state.current_page = 'mess'
-            st.rerun()
-        
-        if st.button("🎉 Events", key="nav_events", use_container_width=True):
-            st.session_state.current_page = 'events'
-            st.rerun()
+        # Navigation buttons with unique keys. The callbacks run before the
+        # rerun the click triggers, so no second st.rerun() is needed.
+        st.button("🏠 Home", key="nav_home", use_container_width=True, on_click=navigate, args=('home',))
+        st.button("🍽️ Mess Reviews", key="nav_mess", use_container_width=True, on_click=navigate, args=('mess',))
+        st.button("🎉 Events", key="nav_events", use_container_width=True, on_click=navigate, args=('events',))
+        st.button("📰 News", key="nav_news", use_container_width=True, on_click=navigate, args=('news',))
         
-        if st.button("📰 News", key="nav_news", use_container_width=True):
-            st.session_state.current_page = 'news'
-            st.rerun()
+        if st.session_state.get('username') in ['admin', 'E22CSEU1156']:
+            st.button("🩺 Diagnostics", key="nav_diagnostics", use_container_width=True,
+                      on_click=navigate, args=('diagnostics',))
         
         # Show current user
         st.sidebar.divider()
         st.sidebar.write(f"👤 **User:** {st.session_state.get('username', 'Unknown')}")
         
         # Logout button
-        if st.sidebar.button("🚪 Logout", key="logout_btn"):
-            st.session_state.authenticated = False
-            st.session_state.current_page = 'home'
-            st.rerun()
+        st.sidebar.button("🚪 Logout", key="logout_btn", on_click=logout)
     
     # Route to pages based on current_page
     current_page = st.session_state.get('current_page', 'home')
-    
-    if current_page == 'home':
-        home.show()
-    elif current_page == 'mess':
-        mess_reviews.show()
-    elif current_page == 'events':
-        events.show()
-    elif current_page == 'news':
-        news.show()
-    else:
-        home.show()  # Default fallback
+    load_page(current_page).show(dm)
 
 if __name__ == "__main__":
     main()
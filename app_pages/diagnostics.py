@@ -0,0 +1,42 @@
+import streamlit as st
+from utils import instrumentation
+
+def show(dm):
+    """Admin-only view of the timings and byte counters recorded so far"""
+    st.title("🩺 Diagnostics")
+
+    # Check if user is admin
+    if st.session_state.get('username') not in ['admin', 'E22CSEU1156']:
+        st.warning("⚠️ Only admins can view diagnostics.")
+        return
+
+    enabled = st.toggle("Record timings", value=instrumentation.is_enabled(),
+                        help="Applies to the whole server process; set KHOLLPOLL_METRICS=1 to start with it on")
+    if enabled != instrumentation.is_enabled():
+        instrumentation.set_enabled(enabled)
+        st.rerun()
+
+    snapshot = instrumentation.snapshot()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ Download JSON", instrumentation.to_json(),
+                           file_name="khollpoll-metrics.json", mime="application/json")
+    with col2:
+        if st.button("🗑️ Reset"):
+            instrumentation.reset()
+            st.rerun()
+
+    st.subheader("Timings")
+    rows = instrumentation.rows()
+    if rows:
+        st.dataframe(rows, use_container_width=True, hide_index=True)
+    else:
+        st.info("Nothing recorded yet." if enabled else "Recording is off.")
+
+    st.subheader("Bytes")
+    if snapshot['bytes']:
+        st.dataframe([{'counter': name, 'bytes': amount, 'MB': round(amount / 2 ** 20, 2)}
+                      for name, amount in snapshot['bytes'].items()],
+                     use_container_width=True, hide_index=True)
+    else:
+        st.info("No reads or writes recorded yet.")
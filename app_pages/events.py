@@ -1,15 +1,16 @@
 import streamlit as st
 from datetime import datetime
-from utils.data_manager import SimpleDataManager
-from PIL import Image
-import os
+from utils.thumbnails import load_thumbnails
+from utils.instrumentation import timed
 
-def show():
+# Events rendered per "load more" step
+PAGE_SIZE = 10
+
+@timed('page.events')
+def show(dm):
     """Show events page"""
     st.title("🎉 Campus Events")
 
-    dm = SimpleDataManager()
-
     tab1, tab2 = st.tabs(["📅 Upcoming Events", "➕ Add Event"])
 
     with tab1:
@@ -18,18 +19,17 @@ def show():
     with tab2:
         add_event_form(dm)
 
+@st.fragment
+@timed('fragment.events')
 def show_events(dm):
-    """Display events with poster-image layout and all previous functionality"""
+    """Display events with poster-image layout and all previous functionality.
+    A fragment, so searching, filtering and paging rerun only this tab."""
     try:
-        data = dm.load_data()
-        events = data.get('events', [])
-
         # If no events exist, add sample events
-        if not events:
+        if not dm.count_events():
             st.info("No events found. Adding sample events...")
             events = get_sample_events()
-            data['events'] = events
-            dm.save_data(data)
+            dm.update_data(lambda data: data.update(events=data.get('events') or events))
             st.success("Sample events added!")
 
         # Search and filter section
@@ -40,18 +40,21 @@ def show_events(dm):
         with col2:
             category = st.selectbox("Category", ["All", "Academic", "Cultural", "Sports", "Technical"])
 
-        # Filter events
-        filtered_events = events
+        # Start from the first page whenever the filters change
+        if st.session_state.get('events_filters') != (search, category):
+            st.session_state.events_filters = (search, category)
+            st.session_state.events_shown = PAGE_SIZE
+        shown = st.session_state.events_shown
+
+        # Filter events (search results come back ranked by relevance)
+        selected = None if category == "All" else category
         if search:
-            search_lower = search.lower()
-            filtered_events = [
-                e for e in filtered_events
-                if (search_lower in e.get('title', '').lower() or
-                    search_lower in e.get('organizer', '').lower() or
-                    search_lower in e.get('description', '').lower())
-            ]
-        if category != "All":
-            filtered_events = [e for e in filtered_events if e.get('category') == category]
+            matches = dm.search_events(search)
+            if selected:
+                matches = [e for e in matches if e.get('category') == selected]
+            total, filtered_events = len(matches), matches[:shown]
+        else:
+            total, filtered_events = dm.count_events(selected), dm.get_events(limit=shown, category=selected)
 
         # Display results count
         if not filtered_events:
@@ -59,24 +62,23 @@ def show_events(dm):
             st.info("💡 Try adjusting your search terms or category filter.")
             return
 
-        st.success(f"✅ Found {len(filtered_events)} event(s)")
+        st.success(f"✅ Found {total} event(s)")
         st.write("---")
 
+        # Load all posters up front so cold thumbnails are decoded in parallel
+        thumbnails = load_thumbnails([e.get('poster', 'assets/default.jpg') for e in filtered_events])
+
         # Display each event with poster-image layout
-        for event in filtered_events:
+        for event, thumbnail in zip(filtered_events, thumbnails):
             st.markdown(f"#### {event.get('organizer', 'Organizer')} PRESENTS")
             col1, col2, col3 = st.columns([2, 3, 1])
 
             # Poster (left)
             with col1:
-                poster_path = event.get('poster', 'assets/default.jpg')
-                if os.path.exists(poster_path):
-                    try:
-                        img = Image.open(poster_path)
-                        img = img.resize((450, 300))  # Fixed size (width, height)
-                        st.image(img)
-                    except Exception:
-                        st.info("Could not open image.")
+                if isinstance(thumbnail, Exception):
+                    st.info("Could not open image.")
+                elif thumbnail is not None:
+                    st.image(thumbnail)
                 else:
                     st.info("No poster available.")
 
@@ -93,12 +95,18 @@ def show_events(dm):
 
             st.markdown("---")
 
+        if total > len(filtered_events):
+            st.button(f"⬇️ Load more events ({total - len(filtered_events)} more)", on_click=show_more)
+
     except Exception as e:
         st.error(f"❌ Error loading events: {str(e)}")
         st.info("🔄 Please try refreshing the page.")
         with st.expander("🐛 Debug Information"):
             st.write(f"Error details: {e}")
 
+def show_more():
+    st.session_state.events_shown += PAGE_SIZE
+
 def add_event_form(dm):
     """Form to add new events, including poster path"""
     st.subheader("➕ Add New Event")
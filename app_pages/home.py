@@ -1,222 +1,30 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-from datetime import datetime, timedelta
-from utils.data_manager import SimpleDataManager
+from datetime import datetime
+from components.ui import inject_css, navigate
+from utils.instrumentation import timed
 
-def show():
+@timed('page.home')
+def show(dm):
     """Show modern home page with enhanced design"""
     
     # Load custom CSS for this page
     load_home_css()
     
     # Main header section
-    render_modern_header()
+    render_modern_header(dm)
     
     # Quick action cards
     render_action_cards()
     
     # Recent activity feed
-    render_activity_feed()
+    render_activity_feed(dm)
 
 def load_home_css():
     """Load custom CSS for home page"""
-    st.markdown("""
-    <style>
-    /* Import Google Fonts */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    /* Header Styles */
-    .hero-container {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        border-radius: 20px;
-        padding: 3rem 2rem;
-        margin-bottom: 2rem;
-        box-shadow: 0 8px 32px rgba(31, 38, 135, 0.37);
-        border: 1px solid rgba(255, 255, 255, 0.18);
-        text-align: center;
-    }
-    
-    .hero-title {
-        font-size: 3rem;
-        font-weight: 700;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        margin-bottom: 1rem;
-    }
-    
-    .hero-subtitle {
-        font-size: 1.3rem;
-        color: #6b7280;
-        margin-bottom: 2rem;
-        font-weight: 400;
-    }
-    
-    /* Action Card Styles */
-    .action-card {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        border-radius: 20px;
-        padding: 2rem;
-        margin-bottom: 1.5rem;
-        box-shadow: 0 8px 32px rgba(31, 38, 135, 0.37);
-        border: 1px solid rgba(255, 255, 255, 0.18);
-        transition: all 0.3s ease;
-        text-align: center;
-        cursor: pointer;
-    }
-    
-    .action-card:hover {
-        transform: translateY(-8px);
-        box-shadow: 0 12px 40px rgba(31, 38, 135, 0.5);
-    }
-    
-    .action-icon {
-        font-size: 3.5rem;
-        margin-bottom: 1rem;
-        display: block;
-    }
-    
-    .action-title {
-        font-size: 1.4rem;
-        font-weight: 600;
-        color: #1f2937;
-        margin-bottom: 0.8rem;
-    }
-    
-    .action-desc {
-        color: #6b7280;
-        line-height: 1.6;
-        font-size: 0.95rem;
-    }
-    
-    /* Stats Card Styles */
-    .stats-grid {
-        display: grid;
-        grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-        gap: 1.5rem;
-        margin: 2rem 0;
-    }
-    
-    .stat-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 2rem 1.5rem;
-        border-radius: 18px;
-        text-align: center;
-        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-        transition: transform 0.3s ease;
-    }
-    
-    .stat-card:hover {
-        transform: translateY(-5px);
-    }
-    
-    .stat-number {
-        font-size: 2.8rem;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-        display: block;
-    }
-    
-    .stat-label {
-        font-size: 1rem;
-        opacity: 0.9;
-        font-weight: 500;
-    }
-    
-    /* Activity Feed Styles */
-    .activity-container {
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(10px);
-        border-radius: 20px;
-        padding: 2rem;
-        margin-top: 2rem;
-        box-shadow: 0 8px 32px rgba(31, 38, 135, 0.37);
-        border: 1px solid rgba(255, 255, 255, 0.18);
-    }
-    
-    .activity-item {
-        background: rgba(102, 126, 234, 0.05);
-        border-radius: 12px;
-        padding: 1.2rem;
-        margin-bottom: 1rem;
-        border-left: 4px solid #667eea;
-        transition: all 0.3s ease;
-    }
-    
-    .activity-item:hover {
-        background: rgba(102, 126, 234, 0.1);
-        transform: translateX(5px);
-    }
-    
-    .activity-user {
-        font-weight: 600;
-        color: #1f2937;
-    }
-    
-    .activity-rating {
-        color: #667eea;
-        font-weight: 600;
-    }
-    
-    .activity-time {
-        color: #6b7280;
-        font-size: 0.85rem;
-    }
-    
-    .activity-comment {
-        color: #4b5563;
-        font-style: italic;
-        margin-top: 0.5rem;
-    }
-    
-    /* Animation Classes */
-    .fade-in {
-        animation: fadeIn 0.8s ease-in;
-    }
-    
-    @keyframes fadeIn {
-        from { opacity: 0; transform: translateY(30px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .pulse-glow {
-        animation: pulseGlow 3s infinite;
-    }
-    
-    @keyframes pulseGlow {
-        0%, 100% { box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4); }
-        50% { box-shadow: 0 12px 35px rgba(102, 126, 234, 0.6); }
-    }
-    
-    /* Responsive Design */
-    @media (max-width: 768px) {
-        .hero-title {
-            font-size: 2.2rem;
-        }
-        
-        .hero-subtitle {
-            font-size: 1.1rem;
-        }
-        
-        .action-card {
-            padding: 1.5rem;
-        }
-        
-        .stat-number {
-            font-size: 2.2rem;
-        }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    inject_css("home.css")
 
-def render_modern_header():
+def render_modern_header(dm):
     """Render modern hero header"""
-    dm = SimpleDataManager()
     stats = dm.get_stats()
     
     username = st.session_state.get('username', 'Student')
@@ -244,9 +52,8 @@ def render_action_cards():
         </div>
         """, unsafe_allow_html=True)
         
-        if st.button("🍽️ Rate Meals", key="rate_meals", use_container_width=True, type="primary"):
-            st.session_state.current_page = 'mess'
-            st.rerun()
+        st.button("🍽️ Rate Meals", key="rate_meals", use_container_width=True, type="primary",
+                  on_click=navigate, args=('mess',))
     
     with col2:
         st.markdown("""
@@ -257,9 +64,8 @@ def render_action_cards():
         </div>
         """, unsafe_allow_html=True)
         
-        if st.button("🎉 Browse Events", key="view_events", use_container_width=True, type="secondary"):
-            st.session_state.current_page = 'events'
-            st.rerun()
+        st.button("🎉 Browse Events", key="view_events", use_container_width=True, type="secondary",
+                  on_click=navigate, args=('events',))
     
     with col3:
         st.markdown("""
@@ -270,14 +76,14 @@ def render_action_cards():
         </div>
         """, unsafe_allow_html=True)
         
-        if st.button("📰 Read News", key="read_news", use_container_width=True, type="secondary"):
-            st.session_state.current_page = 'news'
-            st.rerun()
+        st.button("📰 Read News", key="read_news", use_container_width=True, type="secondary",
+                  on_click=navigate, args=('news',))
 
 
-def render_activity_feed():
-    """Render recent activity feed"""
-    dm = SimpleDataManager()
+@st.fragment
+@timed('fragment.activity_feed')
+def render_activity_feed(dm):
+    """Render recent activity feed (a fragment: its widgets rerun only the feed)"""
     recent_reviews = dm.get_reviews(limit=5)
     
     st.markdown("""
@@ -336,6 +142,7 @@ def render_activity_feed():
     if not recent_reviews:
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
+            # Switching pages needs a full rerun, not just this fragment
             if st.button("🚀 Leave Your First Review", key="first_review", use_container_width=True, type="primary"):
                 st.session_state.current_page = 'mess'
-                st.rerun()
+                st.rerun(scope="app")
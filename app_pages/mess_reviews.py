@@ -1,57 +1,82 @@
 import streamlit as st
-import plotly.express as px
 import pandas as pd
-from utils.data_manager import SimpleDataManager
+import tempfile
+from datetime import datetime
+from utils.export import MIME_TYPES, available_formats, export_reviews
+from utils.review_frame import get_daily_totals, get_review_frame
+from components.charts import create_rating_chart, create_meal_comparison_chart, create_rating_distribution
 from components.ui import metric_card
+from utils.instrumentation import timed
 
-def show():
+@timed('page.mess')
+def show(dm):
     """Show mess reviews page"""
     st.title("🍽️ Mess Reviews")
     
-    dm = SimpleDataManager()
-    
     # Tabs
-    tab1, tab2 = st.tabs(["📊 Dashboard", "⭐ Rate Today"])
+    tab1, tab2, tab3 = st.tabs(["📊 Dashboard", "⭐ Rate Today", "📤 Export"])
     
     with tab1:
         show_dashboard(dm)
     
     with tab2:
         show_rating_form(dm)
+    
+    with tab3:
+        show_export(dm)
 
 def show_dashboard(dm):
     """Show reviews dashboard"""
-    reviews = dm.get_reviews()
+    # Shared columnar copy of the reviews, rebuilt only when they change
+    df = get_review_frame(dm)
     
-    if not reviews:
+    if df.empty:
         st.info("No reviews yet. Be the first to rate!")
         return
     
-    # Convert to DataFrame
-    df = pd.DataFrame(reviews)
-    
     # Metrics
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        metric_card("Total Reviews", len(reviews), "📝")
+        metric_card("Total Reviews", len(df), "📝")
     with col2:
-        avg_rating = df['overall'].mean() if 'overall' in df.columns else 0
+        avg_rating = df['overall'].mean()
         metric_card("Avg Rating", f"{avg_rating:.1f}⭐", "📊")
     with col3:
-        metric_card("This Week", len([r for r in reviews[-7:]]), "📅")
+        week_ago = pd.Timestamp.now() - pd.Timedelta(days=7)
+        metric_card("This Week", int((df['timestamp'] >= week_ago).sum()), "📅")
     with col4:
-        metric_card("Active Users", len(set(r.get('user', '') for r in reviews)), "👥")
+        metric_card("Active Users", df['user'].nunique(), "👥")
     
-    # Chart
-    if len(reviews) > 1:
-        fig = px.line(df, x='timestamp', y='overall', 
-                     title="Rating Trends Over Time")
-        st.plotly_chart(fig, use_container_width=True)
+    # Charts, built from pre-aggregated series so the payload stays small
+    if len(df) > 1:
+        fig = create_rating_chart(df, totals=get_daily_totals(dm))
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            fig = create_meal_comparison_chart(df)
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            fig = create_rating_distribution(df)
+            if fig:
+                st.plotly_chart(fig, use_container_width=True)
 
+@st.fragment
+@timed('fragment.rating_form')
 def show_rating_form(dm):
-    """Show rating form"""
+    """Show rating form (a fragment: submitting reruns only this tab; the
+    dashboard picks the new review up on the next full rerun)"""
     st.subheader("Rate Today's Meals")
     
+    username = st.session_state.get('username', 'Anonymous')
+    
+    # One rating per user per day
+    if dm.has_rated_today(username):
+        st.info("✅ You've already rated today's meals. Come back tomorrow!")
+        return
+    
     with st.form("rating_form"):
         col1, col2 = st.columns(2)
         
@@ -66,10 +91,15 @@ def show_rating_form(dm):
         comments = st.text_area("💬 Comments")
         
         if st.form_submit_button("Submit Review", type="primary"):
+            # Another tab may have submitted since the form was rendered
+            if dm.has_rated_today(username):
+                st.warning("⚠️ You have already rated today's meals.")
+                return
+            
             overall = (breakfast + lunch + snacks + dinner) / 4
             
             review = {
-                'user': st.session_state.get('username', 'Anonymous'),
+                'user': username,
                 'breakfast': breakfast,
                 'lunch': lunch,
                 'snacks': snacks,
@@ -81,3 +111,45 @@ def show_rating_form(dm):
             dm.add_review(review)
             st.success("✅ Review submitted!")
             st.balloons()
+
+def show_export(dm):
+    """Admin-only download of the reviews as CSV, JSONL or Parquet"""
+    st.subheader("Export Reviews")
+    
+    # Check if user is admin
+    if st.session_state.get('username') not in ['admin', 'E22CSEU1156']:
+        st.warning("⚠️ Only admins can export reviews.")
+        return
+    
+    with st.form("export_form"):
+        file_format = st.selectbox("Format", available_formats())
+        col1, col2 = st.columns(2)
+        with col1:
+            since = st.text_input("From date", placeholder="YYYY-MM-DD (optional)").strip()
+        with col2:
+            until = st.text_input("To date", placeholder="YYYY-MM-DD (optional)").strip()
+        user = st.text_input("User", placeholder="Only this user's reviews (optional)").strip()
+        submit = st.form_submit_button("Prepare Export")
+    
+    if not submit:
+        return
+    
+    for day in (since, until):
+        if day:
+            try:
+                datetime.strptime(day, '%Y-%m-%d')
+            except ValueError:
+                st.error(f"Invalid date: {day}. Use YYYY-MM-DD.")
+                return
+    
+    # The export is written chunk by chunk to a temporary file, but
+    # st.download_button keeps the whole file in Streamlit's in-memory
+    # media store while the button is shown (and takes no file objects
+    # opened for both reading and writing), so it is handed over as bytes
+    with tempfile.TemporaryFile() as out:
+        count = export_reviews(dm, out, file_format, since or None, until or None, user or None)
+        out.seek(0)
+        st.download_button(f"⬇️ Download {count} reviews", out.read(), file_name=f"reviews.{file_format}",
+                           mime=MIME_TYPES[file_format])
+    st.caption("The file is held in the app server's memory while this button is shown. "
+               "For a full history, run `python -m utils.export` on the server instead.")
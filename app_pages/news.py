@@ -1,13 +1,15 @@
 import streamlit as st
 from datetime import datetime
-from utils.data_manager import SimpleDataManager
+from utils.instrumentation import timed
 
-def show():
+# Articles rendered per "load more" step
+PAGE_SIZE = 10
+
+@timed('page.news')
+def show(dm):
     """Show news page"""
     st.title("📰 Campus News & Updates")
     
-    dm = SimpleDataManager()
-    
     # Tabs
     tab1, tab2 = st.tabs(["📖 Latest News", "✍️ Add News"])
     
@@ -17,32 +19,39 @@ def show():
     with tab2:
         add_news_form(dm)
 
+@st.fragment
+@timed('fragment.news')
 def show_news(dm):
-    """Display news articles"""
-    data = dm.load_data()
-    news = data.get('news', [])
-    
+    """Display news articles, one page at a time. A fragment, so searching
+    and paging rerun only this tab."""
     # Sample news if none exist
-    if not news:
+    if not dm.get_news_page(limit=1)[0]:
         news = get_sample_news()
-        data['news'] = news
-        dm.save_data(data)
+        dm.update_data(lambda data: data.update(news=data.get('news') or news))
     
     # Search functionality
     search = st.text_input("🔍 Search news...", placeholder="Search by title or content")
     
-    # Filter news
-    filtered_news = news
+    # Start from the first page whenever the search changes
+    if st.session_state.get('news_search') != search:
+        st.session_state.news_search = search
+        st.session_state.news_shown = PAGE_SIZE
+    shown = st.session_state.news_shown
+    
+    # Filter news: search results are ranked by relevance, otherwise newest first
     if search:
-        filtered_news = [n for n in news if search.lower() in n.get('title', '').lower() 
-                        or search.lower() in n.get('content', '').lower()]
+        matches = dm.search_news(search)
+        filtered_news, has_more = matches[:shown], len(matches) > shown
+    else:
+        filtered_news, next_cursor = dm.get_news_page(limit=shown)
+        has_more = next_cursor is not None
     
     if not filtered_news:
         st.info("No news articles found.")
         return
     
     # Display news
-    for article in sorted(filtered_news, key=lambda x: x.get('date', ''), reverse=True):
+    for article in filtered_news:
         st.markdown(f"""
         <div class="card">
             <h3>📰 {article.get('title', 'Untitled')}</h3>
@@ -51,6 +60,12 @@ def show_news(dm):
             <p><small>✍️ By: {article.get('author', 'Unknown')}</small></p>
         </div>
         """, unsafe_allow_html=True)
+    
+    if has_more:
+        st.button("⬇️ Load more news", on_click=show_more)
+
+def show_more():
+    st.session_state.news_shown += PAGE_SIZE
 
 def add_news_form(dm):
     """Form to add news articles"""
@@ -83,9 +98,7 @@ def add_news_form(dm):
                     'created_at': datetime.now().isoformat()
                 }
                 
-                data = dm.load_data()
-                data['news'].append(article)
-                dm.save_data(data)
+                dm.add_news(article)
                 
                 st.success("✅ Article published successfully!")
                 st.rerun()
@@ -0,0 +1,118 @@
+"""Benchmark: full-scan averages/stats vs. per-day rolling aggregates.
+
+The scan side is the algorithm SimpleDataManager used before the
+aggregates existed: parse every timestamp with datetime.fromisoformat and
+sum over the whole review list on every call.
+
+    python benchmarks/bench_aggregates.py --sizes 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_manager import first_day_of_last  # noqa: E402
+from utils.indexes import DailyAggregates  # noqa: E402
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+
+
+def make_reviews(count, days=365, users=5000, seed=42):
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=days)
+    step = days * 86400 / count
+    reviews = []
+    for i in range(count):
+        ratings = {meal: rng.randint(1, 5) for meal in MEALS}
+        reviews.append({
+            'user': f"E22CSEU{rng.randrange(users):04d}",
+            **ratings,
+            'overall': sum(ratings.values()) / 4,
+            'comments': '',
+            'timestamp': (start + timedelta(seconds=i * step)).isoformat(),
+        })
+    return reviews
+
+
+def scan_averages(reviews, days=7):
+    cutoff_date = datetime.now() - timedelta(days=days)
+    recent_reviews = []
+    for review in reviews:
+        try:
+            if datetime.fromisoformat(review.get('timestamp', '')) >= cutoff_date:
+                recent_reviews.append(review)
+        except ValueError:
+            continue
+    averages = {}
+    for meal in MEALS + ['overall']:
+        ratings = [r.get(meal, 0) for r in recent_reviews if r.get(meal) is not None]
+        averages[meal] = sum(ratings) / len(ratings) if ratings else 0
+    return averages
+
+
+def scan_stats(reviews):
+    unique_users = {r.get('user') for r in reviews if r.get('user')}
+    recent = 0
+    cutoff_date = datetime.now() - timedelta(days=7)
+    for review in reviews:
+        try:
+            if datetime.fromisoformat(review.get('timestamp', '')) >= cutoff_date:
+                recent += 1
+        except ValueError:
+            continue
+    return {
+        'total_reviews': len(reviews),
+        'active_users': len(unique_users),
+        'recent_reviews': recent,
+        'avg_rating': sum(r.get('overall', 0) for r in reviews) / len(reviews) if reviews else 0,
+    }
+
+
+def timed(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(size, repeat):
+    reviews = make_reviews(size)
+    since_day = first_day_of_last(7)
+
+    start = time.perf_counter()
+    aggregates = DailyAggregates.from_data({'reviews': reviews})
+    build = time.perf_counter() - start
+
+    new_review = dict(reviews[-1], timestamp=datetime.now().isoformat())
+    return {
+        'reviews': size,
+        'scan_averages_ms': timed(lambda: scan_averages(reviews), repeat) * 1000,
+        'scan_stats_ms': timed(lambda: scan_stats(reviews), repeat) * 1000,
+        'aggregates_build_ms': build * 1000,
+        'aggregates_append_us': timed(lambda: aggregates.add('reviews', new_review), repeat) * 1e6,
+        'aggregates_averages_ms': timed(lambda: aggregates.averages(since_day), repeat) * 1000,
+        'aggregates_stats_ms': timed(lambda: aggregates.stats(since_day), repeat) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        result = run(size, args.repeat)
+        print(json.dumps({key: round(value, 3) if isinstance(value, float) else value
+                          for key, value in result.items()}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark: render cost of app.py, driven headless through Streamlit's AppTest.
+
+Each session walks the same path a student takes: landing -> login ->
+home -> mess -> events (+ search) -> news (+ search) -> submit a review.
+For every step the script is rerun in-process (including any st.rerun()
+the click triggers) and the harness records the wall time, the number of
+elements the app emitted, the bytes of st.markdown it sent and the time
+spent in SimpleDataManager calls.
+
+The first session runs against cold page imports and caches and is
+reported separately from the p50 of the rest. Output is one JSON object
+per step, tagged with the git commit, so runs can be diffed:
+
+    python benchmarks/bench_apptest.py
+    python benchmarks/bench_apptest.py --reviews 100000 --sessions 10 --output after.jsonl
+
+Needs streamlit (see requirements.txt). AppTest always reruns the whole
+script, even for widgets inside st.fragment regions, so these numbers are
+full-run costs; a live fragment rerun only pays for its own region.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import BENCH_PASSWORD, git_commit, write_dataset  # noqa: E402
+from utils import instrumentation  # noqa: E402
+
+SEARCHES = {'events': 'tech', 'news': 'placement'}
+
+
+def find(elements, label):
+    """The first widget in `elements` with the given label"""
+    for element in elements:
+        if element.label == label:
+            return element
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def count_elements(at):
+    """Elements and blocks the last run emitted, in the main area and sidebar"""
+    # Iterating a block yields the block itself and everything below it
+    return sum(sum(1 for _ in block) - 1 for block in (at.main, at.sidebar))
+
+
+def session_steps(username):
+    """(step name, action) pairs for one session; each action prepares the next run"""
+    return [
+        ('landing', lambda at: None),
+        ('open_login', lambda at: at.button(key='landing_login').click()),
+        ('login', lambda at: (find(at.text_input, 'Username').input(username),
+                              find(at.text_input, 'Password').input(BENCH_PASSWORD),
+                              find(at.button, 'Login').click())),
+        ('home', lambda at: at.button(key='nav_home').click()),
+        ('mess', lambda at: at.button(key='nav_mess').click()),
+        ('events', lambda at: at.button(key='nav_events').click()),
+        ('search_events', lambda at: find(at.text_input, 'Search events...').input(SEARCHES['events'])),
+        ('news', lambda at: at.button(key='nav_news').click()),
+        ('search_news', lambda at: find(at.text_input, '🔍 Search news...').input(SEARCHES['news'])),
+        ('open_rating_form', lambda at: at.button(key='nav_mess').click()),
+        ('submit_review', lambda at: (find(at.text_area, '💬 Comments').input('Benchmark review'),
+                                      find(at.button, 'Submit Review').click())),
+    ]
+
+
+def run_session(username, timeout):
+    """Measure every step of one fresh browser session"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=timeout)
+    results = []
+    for step, action in session_steps(username):
+        try:
+            action(at)
+        except LookupError as e:
+            results.append({'step': step, 'error': str(e)})
+            break
+        instrumentation.reset()
+        start = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - start
+        data = [timing for name, timing in instrumentation.snapshot()['timings'].items()
+                if name.startswith('data.')]
+        results.append({
+            'step': step,
+            'wall_ms': round(elapsed * 1000, 3),
+            'elements': count_elements(at),
+            'markdown_bytes': sum(len(markdown.value.encode('utf-8')) for markdown in at.markdown),
+            'data_calls': sum(timing['count'] for timing in data),
+            'data_ms': round(sum(timing['total_ms'] for timing in data), 3),
+            'exceptions': [exception.message for exception in at.exception],
+        })
+    return results
+
+
+def summarize(sessions):
+    """Per step: the cold (first) session, and the p50 wall time of the rest"""
+    rows = []
+    for index, cold in enumerate(sessions[0]):
+        row = dict(cold)
+        if 'wall_ms' in cold:
+            row['cold_wall_ms'] = row.pop('wall_ms')
+            warm = [session[index]['wall_ms'] for session in sessions[1:]
+                    if len(session) > index and 'wall_ms' in session[index]]
+            if warm:
+                row['p50_wall_ms'] = round(statistics.median(warm), 3)
+                row['warm_runs'] = len(warm)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=10_000, help="reviews in the generated data file")
+    parser.add_argument('--sessions', type=int, default=5, help="sessions to run (the first is cold)")
+    parser.add_argument('--timeout', type=float, default=60, help="seconds allowed per script run")
+    parser.add_argument('--output', help="also write the results (JSON lines) to this file")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'reviews.json')
+        counts = write_dataset(path, args.reviews)
+        # Must be set before app.py first imports utils.data_service
+        os.environ['KHOLLPOLL_DATA'] = path
+        os.chdir(ROOT)  # load_css reads assets/ relative to the working directory
+        instrumentation.set_enabled(True)
+
+        # A user per session who has not rated today, so the rating form shows.
+        # Setup messages (the sharded store's "Split ...") go to stderr so
+        # stdout stays one JSON object per line
+        from utils.data_manager import SimpleDataManager
+        with contextlib.redirect_stdout(sys.stderr):
+            dm = SimpleDataManager(path)
+        usernames = [f"bench-apptest-{i}" for i in range(args.sessions)]
+        for username in usernames:
+            dm.add_user(username, BENCH_PASSWORD)
+
+        sessions = [run_session(username, args.timeout) for username in usernames]
+
+    results = [{'commit': commit, 'reviews': counts['reviews'], **row} for row in summarize(sessions)]
+    for row in results:
+        print(json.dumps(row))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(row) + '\n' for row in results)
+    return 1 if any(row.get('error') or row.get('exceptions') for row in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
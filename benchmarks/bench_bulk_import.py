@@ -0,0 +1,69 @@
+"""Benchmark: bulk review import throughput (reviews/minute).
+
+Writes a synthetic survey CSV, imports it into a fresh data file through
+utils.bulk_import and reports the rate for each backend.
+
+    python benchmarks/bench_bulk_import.py --reviews 100000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import json_store  # noqa: E402
+from utils.bulk_import import import_records, read_rows  # noqa: E402
+from utils.data_manager import SimpleDataManager  # noqa: E402
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+
+
+def write_csv(path, count, seed=42):
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=120)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['user'] + MEALS + ['comments', 'timestamp'])
+        for i in range(count):
+            writer.writerow([f"E22CSEU{rng.randrange(5000):04d}"]
+                            + [rng.randint(1, 5) for _ in MEALS]
+                            + ['', (start + timedelta(seconds=i * 60)).isoformat()])
+
+
+def run(backend, csv_path, workdir, count):
+    json_store.clear_cache()
+    dm = SimpleDataManager(os.path.join(workdir, f"bench-{backend}.json"), backend=backend)
+    start = time.perf_counter()
+    result = import_records(dm, 'reviews', read_rows(csv_path))
+    elapsed = time.perf_counter() - start
+    assert result['imported'] == count, result
+    assert len(dm.get_reviews()) == count
+    return {
+        'backend': backend,
+        'reviews': count,
+        'seconds': round(elapsed, 3),
+        'reviews_per_minute': round(count / elapsed * 60),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=100_000)
+    parser.add_argument('--backends', nargs='+', default=['sharded', 'json', 'sqlite'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, 'reviews.csv')
+        write_csv(csv_path, args.reviews)
+        for backend in args.backends:
+            print(json.dumps(run(backend, csv_path, workdir, args.reviews)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark: import cost of the app entry point and each page.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter per
+target, then reports the total import time, the slowest direct imports
+and which heavy libraries got pulled in. `app` should stay free of
+pandas/plotly/PIL/pyarrow; those belong to the pages that draw with them.
+
+    python benchmarks/bench_importtime.py
+    python benchmarks/bench_importtime.py --targets app app_pages.mess_reviews --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = ['app', 'components.auth', 'app_pages.home', 'app_pages.news',
+           'app_pages.events', 'app_pages.mess_reviews']
+
+# Libraries the landing and login screens must not pay for
+HEAVY = ['pandas', 'numpy', 'plotly', 'PIL', 'pyarrow']
+
+
+def importtime(module):
+    """[(cumulative_us, self_us, depth, name)] for one cold import of `module`"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(cumulative_us), int(self_us), depth, name.strip()))
+    return entries
+
+
+def measure(module, repeat, top):
+    totals = []
+    for _ in range(repeat):
+        entries = importtime(module)
+        # Top-level entries (depth 0, after the leading space) add up to the whole import
+        totals.append(sum(cumulative for cumulative, _, depth, _ in entries if depth == 0))
+    imported = {name.split('.')[0] for _, _, _, name in entries}
+    # What the target pulled in directly, heaviest first
+    slowest = sorted((entry for entry in entries if entry[2] == 1), reverse=True)[:top]
+    return {
+        'module': module,
+        'total_ms': round(statistics.median(totals) / 1000, 1),
+        'heavy_imports': [name for name in HEAVY if name in imported],
+        'slowest': [{'name': name, 'cumulative_ms': round(cumulative / 1000, 1)}
+                    for cumulative, _, _, name in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--targets', nargs='+', default=TARGETS)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per target (median is reported)")
+    parser.add_argument('--top', type=int, default=5, help="slowest direct imports to list")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.targets:
+        try:
+            print(json.dumps(measure(module, args.repeat, args.top)))
+        except RuntimeError as e:
+            print(json.dumps({'module': module, 'error': str(e)}))
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Benchmark: peak memory of eager vs lazy snapshot loading.
+
+Streams a synthetic data file of the requested size to disk (in the same
+indent=2 layout JsonStore writes), then runs each query in a fresh process
+and reports its peak RSS and wall time.
+
+    python benchmarks/bench_lazy_load.py --size-mb 500
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.indexes import DailyAggregates  # noqa: E402
+from utils.json_store import GENERATION_KEY, JsonStore  # noqa: E402
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+
+SCENARIOS = {
+    'interpreter_only': "pass",
+    'eager_load': "json_store.LAZY_LOADING = False; store.load()",
+    'lazy_load': "store.load()",
+    'recent_5_reviews': "store.recent('reviews', 5)",
+    'events': "store.records('events')",
+    'review_stats': "store.review_stats('2000-01-01')",
+}
+
+
+def _dump_list(f, key, records, first=False):
+    """Write `"key": [...]` exactly as json.dump(indent=2) would"""
+    f.write(('{\n' if first else ',\n') + f'  {json.dumps(key)}: [')
+    written = 0
+    for record in records:
+        body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+        f.write((',\n    ' if written else '\n    ') + body)
+        written += 1
+    f.write('\n  ]' if written else ']')
+
+
+def write_data_file(path, size_mb, seed=42):
+    """Stream a data file of roughly `size_mb` MB; ~90% of it reviews"""
+    rng = random.Random(seed)
+    aggregates = DailyAggregates()
+    target = size_mb * 1024 * 1024
+    start = datetime.now() - timedelta(days=365)
+
+    def reviews():
+        i = 0
+        while f.tell() < target * 0.9:
+            ratings = {meal: rng.randint(1, 5) for meal in MEALS}
+            review = {
+                'user': f"E22CSEU{rng.randrange(5000):04d}",
+                **ratings,
+                'overall': sum(ratings.values()) / 4,
+                'comments': rng.choice(['', 'Good food today!', 'Snacks could be better.']),
+                'timestamp': (start + timedelta(seconds=i * 10)).isoformat(),
+            }
+            aggregates.add('reviews', review)
+            i += 1
+            yield review
+
+    def articles(kind):
+        i = 0
+        while f.tell() < target * (0.95 if kind == 'events' else 1.0):
+            i += 1
+            yield {
+                'title': f"{kind} {i}",
+                'description' if kind == 'events' else 'content': 'Lorem ipsum dolor sit amet. ' * 20,
+                'category': rng.choice(['Academic', 'Cultural', 'Sports', 'Technical']),
+                'date': (start + timedelta(days=i % 365)).strftime('%Y-%m-%d'),
+            }
+
+    with open(path, 'w', encoding='utf-8') as f:
+        _dump_list(f, 'reviews', reviews(), first=True)
+        _dump_list(f, 'events', articles('events'))
+        _dump_list(f, 'news', articles('news'))
+        _dump_list(f, 'users', [{'username': 'admin', 'password': '', 'role': 'admin'}])
+        f.write(f',\n  "{GENERATION_KEY}": 0\n}}')
+
+    JsonStore(path).write_aggregates(0, aggregates)
+    return aggregates.total_reviews
+
+
+def run_scenario(path, name):
+    """Run one scenario in a fresh interpreter; returns (peak RSS MB, seconds)"""
+    code = (f"import sys, time; sys.path.insert(0, {ROOT!r}); sys.path.insert(0, {os.path.dirname(__file__)!r})\n"
+            f"from bench_lazy_load import peak_rss_mb\n"
+            f"from utils import json_store\n"
+            f"store = json_store.JsonStore({path!r})\n"
+            f"start = time.perf_counter(); {SCENARIOS[name]}; elapsed = time.perf_counter() - start\n"
+            f"print(peak_rss_mb(), elapsed)")
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    peak_mb, elapsed = output.split()
+    return float(peak_mb), float(elapsed)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB"""
+    try:
+        # Linux: unlike ru_maxrss, VmHWM is not inherited from the parent across exec
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2 ** 20 if sys.platform == 'darwin' else 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=500)
+    parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'reviews.json')
+        start = time.perf_counter()
+        reviews = write_data_file(path, args.size_mb)
+        print(json.dumps({'file_mb': round(os.path.getsize(path) / 2 ** 20, 1), 'reviews': reviews,
+                          'generate_seconds': round(time.perf_counter() - start, 1)}))
+        for name in args.scenarios:
+            peak_mb, elapsed = run_scenario(path, name)
+            print(json.dumps({'scenario': name, 'peak_rss_mb': round(peak_mb, 1),
+                              'seconds': round(elapsed, 3)}))
+
+
+if __name__ == '__main__':
+    main()
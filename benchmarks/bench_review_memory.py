@@ -0,0 +1,84 @@
+"""Benchmark: memory and aggregation cost of review dicts vs ReviewColumns.
+
+Builds N synthetic reviews the way the JSON store parses them (one dict per
+review, fresh strings per record), measures the traced heap they occupy
+with tracemalloc, then does the same for the column-stored copy and times
+a full DailyAggregates rebuild over each.
+
+    python benchmarks/bench_review_memory.py --reviews 1000000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.indexes import DailyAggregates  # noqa: E402
+from utils.review_columns import ReviewColumns  # noqa: E402
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+
+
+def review_lines(count, seed=42):
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=365)
+    for i in range(count):
+        ratings = {meal: rng.randint(1, 5) for meal in MEALS}
+        yield json.dumps({
+            'user': f"E22CSEU{rng.randrange(5000):04d}",
+            **ratings,
+            'overall': sum(ratings.values()) / 4,
+            'comments': rng.choice(['', 'Good food today!', 'Snacks could be better.']),
+            'timestamp': (start + timedelta(seconds=i * 10, microseconds=rng.randrange(10 ** 6))).isoformat(),
+        })
+
+
+def traced(build):
+    """(result, MB of heap it holds, seconds to build)"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / 2 ** 20, elapsed
+
+
+def timed(function):
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    lines = list(review_lines(args.reviews))
+    dicts, dicts_mb, _ = traced(lambda: [json.loads(line) for line in lines])
+    columns, columns_mb, build_seconds = traced(lambda: ReviewColumns.from_records(dicts))
+    del lines
+
+    print(json.dumps({'reviews': args.reviews, 'dicts_mb': round(dicts_mb, 1),
+                      'columns_mb': round(columns_mb, 1),
+                      'reduction': round(dicts_mb / columns_mb, 1),
+                      'columns_build_seconds': round(build_seconds, 2)}))
+
+    dict_seconds = timed(lambda: DailyAggregates.from_data({'reviews': dicts}))
+    column_seconds = timed(lambda: DailyAggregates.from_data({'reviews': columns}))
+    print(json.dumps({'aggregate_dicts_seconds': round(dict_seconds, 2),
+                      'aggregate_columns_seconds': round(column_seconds, 2),
+                      'speedup': round(dict_seconds / column_seconds, 1)}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""Benchmark suite: the data layer and chart builders at growing data sizes.
+
+For each size a synthetic data/reviews.json (plus its aggregates sidecar) is
+streamed to a temp directory, with event, news and user counts scaled to
+match. Each (size, backend) pair then runs in a fresh process that times
+the SimpleDataManager calls the pages make and reports p50/p99 latency,
+throughput and the process's peak RSS. Output is one JSON object per line,
+tagged with the git commit, so runs can be diffed:
+
+    python benchmarks/bench_suite.py --output before.jsonl
+    python benchmarks/bench_suite.py --sizes 1000 10000 --compare before.jsonl
+
+Chart timings need pandas and plotly and are skipped without them.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_lazy_load import _dump_list, peak_rss_mb  # noqa: E402
+from utils import json_store, passwords  # noqa: E402
+from utils.data_manager import SimpleDataManager  # noqa: E402
+from utils.indexes import DailyAggregates  # noqa: E402
+from utils.sqlite_store import migrate_json_to_sqlite  # noqa: E402
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+BACKENDS = ['sharded', 'json']
+CATEGORIES = ['Academic', 'Cultural', 'Sports', 'Technical']
+WORDS = ['hackathon', 'fest', 'workshop', 'seminar', 'placement', 'library', 'hostel', 'cricket',
+         'music', 'robotics', 'exam', 'canteen', 'alumni', 'coding', 'football', 'drama']
+SEARCHES = ['tech', 'fest', 'cricket match', 'placement drive', 'hostel', 'zzz']
+BENCH_PASSWORD = 'bench-password'
+
+
+def dataset_counts(reviews):
+    """Events, news and users that go with `reviews` reviews"""
+    return {
+        'events': min(2000, max(20, reviews // 500)),
+        'news': min(3000, max(30, reviews // 300)),
+        'users': min(5000, max(50, reviews // 20)),
+    }
+
+
+def write_dataset(path, reviews, seed=42):
+    """Stream a data file with `reviews` reviews over the last year (the
+    newest from today) plus matching events, news and users"""
+    rng = random.Random(seed)
+    counts = dataset_counts(reviews)
+    aggregates = DailyAggregates()
+    now = datetime.now()
+    start = now - timedelta(days=365)
+    step = (now - start) / max(reviews, 1)
+    # One hash shared by every user: the suite measures lookups, not hashing
+    password = passwords.hash_password(BENCH_PASSWORD)
+
+    def review_records():
+        for i in range(reviews):
+            ratings = {meal: rng.randint(1, 5) for meal in MEALS}
+            review = {
+                'user': f"E22CSEU{rng.randrange(counts['users']):04d}",
+                **ratings,
+                'overall': sum(ratings.values()) / 4,
+                'comments': rng.choice(['', 'Good food today!', 'Snacks could be better.']),
+                'timestamp': (start + step * (i + 1)).isoformat(),
+            }
+            aggregates.add('reviews', review)
+            yield review
+
+    def text(words):
+        return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+    def articles(kind):
+        for i in range(counts[kind]):
+            article = {
+                'title': text(4),
+                'category': rng.choice(CATEGORIES),
+                'date': (start + timedelta(days=rng.randrange(400))).strftime('%Y-%m-%d'),
+            }
+            if kind == 'events':
+                article.update(description=text(30), time='10:00', location='Auditorium',
+                               organizer=text(2), image='')
+            else:
+                article.update(content=text(60), author=text(2))
+            yield article
+
+    users = [{'username': 'admin', 'password': password, 'role': 'admin'}]
+    users += [{'username': f"E22CSEU{i:04d}", 'password': password, 'role': 'student'}
+              for i in range(counts['users'])]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        _dump_list(f, 'reviews', review_records(), first=True)
+        _dump_list(f, 'events', articles('events'))
+        _dump_list(f, 'news', articles('news'))
+        _dump_list(f, 'users', users)
+        f.write(f',\n  "{json_store.GENERATION_KEY}": 0\n}}')
+    json_store.JsonStore(path).write_aggregates(0, aggregates)
+    return {'reviews': reviews, **counts}
+
+
+def summarize(op, latencies):
+    ordered = sorted(latencies)
+    total = sum(ordered)
+
+    def percentile(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        'op': op,
+        'n': len(ordered),
+        'p50_ms': round(percentile(0.5), 3),
+        'p99_ms': round(percentile(0.99), 3),
+        'ops_per_sec': round(len(ordered) / total, 1) if total else None,
+    }
+
+
+def time_op(op, function, repeat):
+    latencies = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(i)
+        latencies.append(time.perf_counter() - start)
+    return summarize(op, latencies)
+
+
+def chart_ops(dm, repeat):
+    """Chart builder timings, or None without pandas/plotly"""
+    try:
+        from components import charts
+        from utils.review_frame import get_daily_totals, get_review_frame
+    except ImportError:
+        return None
+    frame = get_review_frame(dm)
+    totals = get_daily_totals(dm)
+    return [
+        time_op('review_frame_build', lambda i: charts.as_frame(dm.review_columns()), max(1, repeat // 10)),
+        time_op('create_rating_chart', lambda i: charts.create_rating_chart(frame, totals), repeat),
+        time_op('create_meal_comparison_chart', lambda i: charts.create_meal_comparison_chart(frame), repeat),
+        time_op('create_rating_distribution', lambda i: charts.create_rating_distribution(frame), repeat),
+    ]
+
+
+def run_child(path, backend, repeat):
+    """Time every operation against `path`; runs in its own process"""
+    setup_start = time.perf_counter()
+    if backend == 'sqlite':
+        migrate_json_to_sqlite(path, os.path.splitext(path)[0] + '.db')
+    dm = SimpleDataManager(path, backend=backend)  # Sharded: splits the file first
+    results = [{'op': 'open', 'n': 1, 'p50_ms': round((time.perf_counter() - setup_start) * 1000, 3)}]
+
+    def cold_load(i):
+        json_store.clear_cache()
+        dm.load_data()
+
+    results.append(time_op('load_data_cold', cold_load, 3))
+    results.append(time_op('load_data_warm', lambda i: dm.load_data(), 3))
+    results.append(time_op('has_rated_today', lambda i: dm.has_rated_today(f"E22CSEU{i % 50:04d}"), repeat))
+    results.append(time_op('get_average_ratings', lambda i: dm.get_average_ratings(), repeat))
+    results.append(time_op('get_stats', lambda i: dm.get_stats(), repeat))
+    results.append(time_op('validate_user', lambda i: dm.validate_user('E22CSEU0001', BENCH_PASSWORD), repeat))
+    results.append(time_op('search_events', lambda i: dm.search_events(SEARCHES[i % len(SEARCHES)]), repeat))
+    results.append(time_op('search_news', lambda i: dm.search_news(SEARCHES[i % len(SEARCHES)]), repeat))
+    results.append(time_op('get_events_page', lambda i: dm.get_events(0, 10, CATEGORIES[i % 4]), repeat))
+    results.append(time_op('get_news_page', lambda i: dm.get_news_page(limit=10), repeat))
+    results.append(time_op('recent_reviews', lambda i: dm.get_reviews(limit=5), repeat))
+    charts = chart_ops(dm, repeat)
+    results.extend(charts or [{'op': 'charts', 'skipped': 'pandas/plotly not installed'}])
+
+    def add_review(i):
+        dm.add_review({'user': f"bench-{i}", 'breakfast': 4, 'lunch': 3, 'snacks': 5, 'dinner': 4})
+
+    results.append(time_op('add_review', add_review, repeat))
+    results.append({'op': 'peak_rss', 'peak_rss_mb': round(peak_rss_mb(), 1)})
+    print(json.dumps(results))
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the p50 ratio (new / baseline) of every op found in both runs"""
+    baseline = {}
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            row = json.loads(line)
+            if 'p50_ms' in row:
+                baseline[(row['size'], row['backend'], row['op'])] = row['p50_ms']
+    for row in results:
+        old = baseline.get((row['size'], row['backend'], row['op']))
+        if old and row.get('p50_ms') is not None:
+            print(json.dumps({'size': row['size'], 'backend': row['backend'], 'op': row['op'],
+                              'baseline_p50_ms': old, 'p50_ms': row['p50_ms'],
+                              'ratio': round(row['p50_ms'] / old, 2)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES)
+    parser.add_argument('--backends', nargs='+', default=BACKENDS, choices=['sharded', 'json', 'sqlite'])
+    parser.add_argument('--repeat', type=int, default=200, help="calls per timed operation")
+    parser.add_argument('--output', help="also write the results (JSON lines) to this file")
+    parser.add_argument('--compare', help="results file of an earlier run to compare p50s against")
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'BACKEND'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.repeat)
+        return
+
+    commit = git_commit()
+    results = []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            source = os.path.join(workdir, 'source.json')
+            start = time.perf_counter()
+            counts = write_dataset(source, size)
+            print(json.dumps({'size': size, 'dataset': counts, 'file_mb': round(os.path.getsize(source) / 2 ** 20, 1),
+                              'generate_seconds': round(time.perf_counter() - start, 1)}), file=sys.stderr)
+            for backend in args.backends:
+                # Each backend gets its own copy of the data file
+                path = os.path.join(workdir, backend, 'reviews.json')
+                os.makedirs(os.path.dirname(path))
+                os.link(source, path)
+                os.link(os.path.splitext(source)[0] + '.aggregates.json', os.path.splitext(path)[0] + '.aggregates.json')
+                output = subprocess.run([sys.executable, __file__, '--child', path, backend, '--repeat', str(args.repeat)],
+                                        check=True, capture_output=True, text=True).stdout
+                for row in json.loads(output.splitlines()[-1]):
+                    row = {'commit': commit, 'size': size, 'backend': backend, **row}
+                    results.append(row)
+                    print(json.dumps(row))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(row) + '\n' for row in results)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
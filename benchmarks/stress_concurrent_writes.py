@@ -0,0 +1,99 @@
+"""Stress test: many processes x threads calling add_review at once.
+
+Every review carries a unique id; afterwards a fresh process must see every
+single one exactly once, including across journal compactions.
+
+    python benchmarks/stress_concurrent_writes.py --processes 8 --threads 4 --reviews 200
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import json_store  # noqa: E402
+from utils.data_manager import SimpleDataManager  # noqa: E402
+
+
+def _worker(file_path, process_id, threads, reviews, compact_after):
+    json_store.COMPACT_AFTER = compact_after
+    dm = SimpleDataManager(file_path)
+    failures = []
+
+    def submit(thread_id):
+        for i in range(reviews):
+            ok = dm.add_review({
+                'user': f"p{process_id}-t{thread_id}-{i}",
+                'breakfast': 1 + i % 5,
+                'lunch': 1 + (i + 1) % 5,
+                'snacks': 1 + (i + 2) % 5,
+                'dinner': 1 + (i + 3) % 5,
+                'comments': '',
+            })
+            if not ok:
+                failures.append((thread_id, i))
+
+    pool = [threading.Thread(target=submit, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    if failures:
+        sys.exit(f"process {process_id}: {len(failures)} add_review calls failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--reviews', type=int, default=100, help="reviews per thread")
+    parser.add_argument('--compact-after', type=int, default=250,
+                        help="journal size that triggers compaction (kept low to exercise it)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = os.path.join(tmp, 'reviews.json')
+        SimpleDataManager(file_path)
+
+        start = time.perf_counter()
+        procs = [
+            multiprocessing.Process(
+                target=_worker,
+                args=(file_path, p, args.threads, args.reviews, args.compact_after))
+            for p in range(args.processes)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+        if any(proc.exitcode != 0 for proc in procs):
+            sys.exit("a worker process failed")
+
+        json_store.clear_cache()
+        reviews = SimpleDataManager(file_path).get_reviews()
+        users = [r['user'] for r in reviews]
+        expected = args.processes * args.threads * args.reviews
+        duplicates = len(users) - len(set(users))
+
+        print(json.dumps({
+            'expected': expected,
+            'found': len(users),
+            'unique': len(set(users)),
+            'duplicates': duplicates,
+            'seconds': round(elapsed, 3),
+            'reviews_per_second': round(expected / elapsed, 1),
+        }))
+        if len(set(users)) != expected or duplicates:
+            sys.exit("FAILED: reviews were lost or duplicated")
+        print("OK: no reviews lost")
+
+
+if __name__ == '__main__':
+    main()
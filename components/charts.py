@@ -2,24 +2,48 @@ import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import streamlit as st
+from utils.review_frame import as_frame, daily_totals
 
-def create_rating_chart(reviews_data):
-    """Create rating trends chart"""
-    if not reviews_data:
-        return None
-    
-    df = pd.DataFrame(reviews_data)
-    if 'timestamp' not in df.columns or 'overall' not in df.columns:
+# Most points a trend chart sends to the browser, however long the history
+MAX_POINTS = 300
+
+# Periods tried, finest first, until the trend fits in MAX_POINTS
+RESAMPLE_STEPS = [('D', 'Daily'), ('W', 'Weekly'), ('MS', 'Monthly'), ('QS', 'Quarterly'), ('YS', 'Yearly')]
+
+def downsample(totals, max_points=MAX_POINTS):
+    """Coarsen per-day (sum, count) totals until at most `max_points` remain.
+
+    Averages are count-weighted, so a busy day counts for more than a quiet
+    one. Returns the (date, overall) series and the period label used.
+    """
+    for freq, label in RESAMPLE_STEPS:
+        resampled = totals if freq == 'D' else totals.resample(freq).sum()
+        resampled = resampled[resampled['count'] > 0]
+        if len(resampled) <= max_points:
+            break
+    
+    series = (resampled['sum'] / resampled['count']).rename('overall')
+    return series.rename_axis('date').reset_index(), label
+
+def create_rating_chart(reviews_data, totals=None, max_points=MAX_POINTS):
+    """Create rating trends chart from a review frame (or list of reviews).
+
+    Pass precomputed `totals` (see utils.review_frame.get_daily_totals) to
+    skip the per-day aggregation.
+    """
+    if totals is None:
+        df = as_frame(reviews_data)
+        if df.empty:
+            return None
+        totals = daily_totals(df)
+    
+    # Average per period, coarsened so the payload stays bounded
+    trend, period = downsample(totals, max_points)
+    if trend.empty:
         return None
     
-    # Convert timestamp to datetime
-    df['date'] = pd.to_datetime(df['timestamp']).dt.date
-    
-    # Group by date and calculate average
-    daily_avg = df.groupby('date')['overall'].mean().reset_index()
-    
-    fig = px.line(daily_avg, x='date', y='overall',
-                  title='Daily Average Ratings',
+    fig = px.line(trend, x='date', y='overall',
+                  title=f'{period} Average Ratings',
                   labels={'overall': 'Average Rating', 'date': 'Date'})
     
     fig.update_layout(
@@ -32,19 +56,15 @@ def create_rating_chart(reviews_data):
     return fig
 
 def create_meal_comparison_chart(reviews_data):
-    """Create meal comparison chart"""
-    if not reviews_data:
+    """Create meal comparison chart from a review frame (or list of reviews)"""
+    df = as_frame(reviews_data)
+    if df.empty:
         return None
     
-    df = pd.DataFrame(reviews_data)
     meal_columns = ['breakfast', 'lunch', 'snacks', 'dinner']
     
-    # Check if meal columns exist
-    if not all(col in df.columns for col in meal_columns):
-        return None
-    
     # Calculate averages
-    averages = df[meal_columns].mean()
+    averages = df[meal_columns].mean().astype(float)
     
     fig = go.Figure(data=[
         go.Bar(x=meal_columns, y=averages.values,
@@ -64,20 +84,17 @@ def create_meal_comparison_chart(reviews_data):
     return fig
 
 def create_rating_distribution(reviews_data):
-    """Create rating distribution pie chart"""
-    if not reviews_data:
-        return None
-    
-    df = pd.DataFrame(reviews_data)
-    if 'overall' not in df.columns:
+    """Create rating distribution pie chart from a review frame (or list of reviews)"""
+    df = as_frame(reviews_data)
+    if df.empty:
         return None
     
-    # Create rating bins
-    df['rating_bin'] = pd.cut(df['overall'], 
-                             bins=[0, 2, 3, 4, 5], 
-                             labels=['Poor (1-2)', 'Fair (2-3)', 'Good (3-4)', 'Excellent (4-5)'])
+    # Create rating bins (without touching the shared frame)
+    rating_bin = pd.cut(df['overall'], 
+                        bins=[0, 2, 3, 4, 5], 
+                        labels=['Poor (1-2)', 'Fair (2-3)', 'Good (3-4)', 'Excellent (4-5)'])
     
-    rating_counts = df['rating_bin'].value_counts()
+    rating_counts = rating_bin.value_counts()
     
     fig = px.pie(values=rating_counts.values, 
                 names=rating_counts.index,
@@ -1,48 +1,34 @@
 import streamlit as st
-import base64
+from utils.instrumentation import timed
+from utils.static_assets import data_uri, image_base64, style_tag
+
+LOGO_PATH = "assets/img/logo.png"
+LOGO_SIZE = (100, 100)  # 2x the 50px it is displayed at
 
 def load_css():
     """Load custom CSS with proper color contrast"""
-    st.markdown("""
-    <style>
-    .stMarkdown, .stMarkdown p, .stMarkdown h1, .stMarkdown h2, .stMarkdown h3 {
-        color: var(--text-color) !important;
-    }
-    
-    .event-card {
-        background: var(--background-color) !important;
-        color: var(--text-color) !important;
-        border: 1px solid var(--secondary-background-color) !important;
-        border-radius: 10px !important;
-        padding: 1rem !important;
-        margin: 1rem 0 !important;
-    }
+    inject_css("app.css")
 
-    .main-header img {
-        height: 50px;
-        width: 50px;
-        margin-right: 10px;
-        vertical-align: middle;
-    }
+def inject_css(*names):
+    """Emit stylesheets from assets/css (read and minified once per process)"""
+    st.markdown(style_tag(*names), unsafe_allow_html=True)
 
-    .event-card h3, .event-card p {
-        color: var(--text-color) !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+def navigate(page):
+    """Button on_click callback: switch page before the click's own rerun,
+    so navigating costs one script run instead of two"""
+    st.session_state.current_page = page
 
 def image_to_base64(img_path):
-    """Convert local image to base64"""
-    with open(img_path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+    """Convert local image to base64 (cached per process)"""
+    return image_base64(img_path)
 
+@timed('ui.render_header')
 def render_header():
     """Render main header with image logo"""
-    logo_base64 = image_to_base64("assets/img/logo.png")
     st.markdown(f"""
     <div class="main-header">
         <h1>
-            <img src="data:image/png;base64,{logo_base64}"/>
+            <img src="{data_uri(LOGO_PATH, LOGO_SIZE)}"/>
             KhollPoll
         </h1>
     </div>
@@ -0,0 +1,163 @@
+"""Bulk import of reviews, events and news from CSV or JSONL files
+
+Rows are streamed from the input, validated and written in large batches
+(one journal write or SQLite transaction per batch), so back-filling a
+semester of survey results costs a handful of writes instead of one per
+review.
+
+    python -m utils.bulk_import reviews surveys.csv
+    python -m utils.bulk_import news archive.jsonl --data data/reviews.db
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from utils.data_manager import SimpleDataManager
+from utils.helpers import validate_rating
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+BATCH_SIZE = 20_000
+
+# Rejected rows reported back individually; the rest are only counted
+MAX_ERRORS = 20
+
+REQUIRED_FIELDS = {
+    'reviews': ['user'],
+    'events': ['title'],
+    'news': ['title'],
+}
+
+
+def read_rows(path: str, file_format: Optional[str] = None) -> Iterator[Any]:
+    """Stream rows from a .csv or .jsonl file (format taken from the extension)"""
+    file_format = file_format or os.path.splitext(path)[1].lstrip('.').lower()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+        elif file_format in ('jsonl', 'ndjson'):
+            # Lines are decoded in parse_record so one bad line only skips itself
+            for line in f:
+                if line.strip():
+                    yield line
+        else:
+            raise ValueError(f"Unsupported import format: {file_format!r} (use csv or jsonl)")
+
+
+def _clean(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty CSV cells and surrounding whitespace"""
+    cleaned = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        if value is not None:
+            cleaned[key.strip()] = value
+    return cleaned
+
+
+def _rating(value: Any):
+    """A 1-5 rating as int when whole (like the rating form), else float"""
+    if not validate_rating(value):
+        raise ValueError(f"invalid rating {value!r}")
+    rating = float(value)
+    return int(rating) if rating.is_integer() else rating
+
+
+def parse_review(row: Dict[str, Any]) -> Dict[str, Any]:
+    review = _clean(row)
+    rated = False
+    for meal in MEALS:
+        if meal in review:
+            review[meal] = _rating(review[meal])
+            rated = True
+    if not rated:
+        raise ValueError("no meal ratings")
+    if 'overall' in review:
+        review['overall'] = float(review['overall'])
+    if 'timestamp' in review:
+        # Stored in the form the app writes, so month and day lookups see it
+        if not isinstance(review['timestamp'], str):
+            raise ValueError(f"timestamp {review['timestamp']!r} is not an ISO date string")
+        review['timestamp'] = datetime.fromisoformat(review['timestamp']).isoformat()
+    return review
+
+
+def parse_record(collection: str, row: Any) -> Dict[str, Any]:
+    """Validate and normalize one input row, raising ValueError if unusable"""
+    if isinstance(row, str):
+        row = json.loads(row)
+    if not isinstance(row, dict):
+        raise ValueError("not a JSON object")
+    record = parse_review(row) if collection == 'reviews' else _clean(row)
+    missing = [field for field in REQUIRED_FIELDS[collection] if field not in record]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    return record
+
+
+def import_records(dm: SimpleDataManager, collection: str, rows: Iterable[Any],
+                   batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """Validate `rows` and add them to `collection` in batches.
+
+    Returns counts of imported and skipped rows plus the first few errors.
+    """
+    result = {'imported': 0, 'skipped': 0, 'errors': []}
+    batch: List[Dict[str, Any]] = []
+    batch_start = 1
+
+    def error(message: str):
+        if len(result['errors']) < MAX_ERRORS:
+            result['errors'].append(message)
+
+    def flush(last_line: int):
+        written = dm.add_records(collection, batch)
+        result['imported'] += written
+        if written < len(batch):
+            result['skipped'] += len(batch) - written
+            span = f"row {last_line}" if batch_start == last_line else f"rows {batch_start}-{last_line}"
+            error(f"{span}: write failed, {len(batch) - written} of {len(batch)} not imported")
+        batch.clear()
+
+    line_number = 0
+    for line_number, row in enumerate(rows, start=1):
+        if not batch:
+            batch_start = line_number
+        try:
+            batch.append(parse_record(collection, row))
+        except (ValueError, TypeError) as e:
+            result['skipped'] += 1
+            error(f"row {line_number}: {e}")
+            continue
+        if len(batch) >= batch_size:
+            flush(line_number)
+    if batch:
+        flush(line_number)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import reviews, events or news.")
+    parser.add_argument('collection', choices=sorted(REQUIRED_FIELDS))
+    parser.add_argument('path', help="CSV or JSONL file to import")
+    parser.add_argument('--data', default="data/reviews.json", help="data file to import into")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="input format (default: from extension)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    dm = SimpleDataManager(args.data)
+    result = import_records(dm, args.collection, read_rows(args.path, args.format), args.batch_size)
+    for error in result['errors']:
+        print(error, file=sys.stderr)
+    print(f"Imported {result['imported']} {args.collection}, skipped {result['skipped']}")
+    return 0 if result['imported'] or not result['skipped'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
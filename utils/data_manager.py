@@ -1,256 +1,364 @@
-import json
 import os
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 
+from utils import passwords, search
+from utils.instrumentation import instrumented, report_error
+from utils.json_store import JsonStore
+from utils.review_columns import ReviewColumns
+from utils.sharded_store import ShardedStore, migrate_json_to_shards
+from utils.sqlite_store import SQLiteStore
+
+# Storage backend used when none is passed explicitly: "sharded", "json" or "sqlite"
+DEFAULT_BACKEND = os.environ.get('KHOLLPOLL_BACKEND', 'sharded')
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+def first_day_of_last(days: int) -> str:
+    """First day (YYYY-MM-DD) of the last `days` calendar days, today included"""
+    return (datetime.now() - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+
+def create_store(file_path: str, backend: Optional[str] = None):
+    """Build the storage backend for `file_path`.
+
+    A path ending in .db/.sqlite always uses SQLite; otherwise `backend`
+    (default: $KHOLLPOLL_BACKEND, falling back to "sharded") decides. The
+    sharded and SQLite backends map a JSON path to the directory or database
+    next to it, e.g. data/reviews.json -> data/reviews/ or data/reviews.db.
+    """
+    root, extension = os.path.splitext(file_path)
+    if extension in SQLITE_EXTENSIONS:
+        return SQLiteStore(file_path)
+
+    backend = backend or DEFAULT_BACKEND
+    if backend == 'sharded':
+        return ShardedStore(root)
+    if backend == 'json':
+        return JsonStore(file_path)
+    if backend == 'sqlite':
+        return SQLiteStore(root + '.db')
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+@instrumented('data')
 class SimpleDataManager:
-    """Simple JSON-based data manager for KhollPoll"""
+    """Simple data manager for KhollPoll
+
+    The public methods stay the same whichever storage backend sits behind
+    them: the JSON snapshot-plus-journal store (default) or SQLite.
+    """
     
-    def __init__(self, file_path: str = "data/reviews.json"):
+    def __init__(self, file_path: str = "data/reviews.json",
+                 backend: Union[str, JsonStore, ShardedStore, SQLiteStore, None] = None):
         self.file_path = file_path
+        # Create directory if it doesn't exist
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        if backend is None or isinstance(backend, str):
+            self.store = create_store(file_path, backend)
+        else:
+            self.store = backend
         self.ensure_data_file()
     
     def ensure_data_file(self):
-        """Create data file and directory if they don't exist"""
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        
-        # Create file with initial structure if it doesn't exist
-        if not os.path.exists(self.file_path):
+        """Create data file with its initial structure if it doesn't exist"""
+        if (not self.store.exists() and isinstance(self.store, ShardedStore)
+                and os.path.isfile(self.file_path)):
+            # First run of the sharded store next to a single-file data set
+            counts = migrate_json_to_shards(self.file_path, self.store.directory)
+            print(f"Split {self.file_path} into {self.store.directory}: {counts}")
+        if not self.store.exists():
             initial_data = {
                 "reviews": [],
                 "events": [],
                 "news": [],
                 "users": [
-                    {"username": "admin", "password": "password123", "role": "admin"},
-                    {"username": "E22CSEU1156", "password": "student123", "role": "student"}
+                    {"username": "admin", "password": passwords.hash_password("password123"), "role": "admin"},
+                    {"username": "E22CSEU1156", "password": passwords.hash_password("student123"), "role": "student"}
                 ]
             }
             self.save_data(initial_data)
 
-    
     def load_data(self) -> Dict[str, List]:
-        """Load data from JSON file"""
+        """Load all data (a private copy the caller may modify)"""
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                
-            # Ensure all required keys exist
-            if 'reviews' not in data:
-                data['reviews'] = []
-            if 'events' not in data:
-                data['events'] = []
-            if 'news' not in data:
-                data['news'] = []
-                
-            return data
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading data: {e}")
+            return {key: list(value) if isinstance(value, (list, ReviewColumns)) else value
+                    for key, value in self.store.load().items()}
+        except Exception as e:
+            report_error("Error loading data", e)
             # Return default structure
             return {
                 "reviews": [],
                 "events": [],
                 "news": []
             }
-    
+
     def save_data(self, data: Dict[str, Any]) -> bool:
-        """Save data to JSON file"""
+        """Replace all stored data with `data`"""
+        try:
+            self.store.save(data)
+            return True
+        except Exception as e:
+            report_error("Error saving data", e)
+            return False
+
+    def update_data(self, mutate: Callable[[Dict[str, Any]], None]) -> bool:
+        """Apply `mutate` to a fresh copy of the data and save it, holding the
+        store's write lock so no concurrent append is lost in between"""
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.store.update(mutate)
             return True
         except Exception as e:
-            print(f"Error saving data: {e}")
+            report_error("Error updating data", e)
             return False
         
+    def data_version(self, collection: Optional[str] = None):
+        """Opaque token that changes whenever the stored data changes.
+
+        Pass a collection name to only track that collection. Use it to key
+        caches of anything derived from the data.
+        """
+        try:
+            return self.store.version(collection)
+        except Exception as e:
+            report_error("Error getting data version", e)
+            return None
+
     def get_users(self):
-        data = self.load_data()
-        return data.get('users', [])
+        try:
+            return self.store.records('users')
+        except Exception as e:
+            report_error("Error getting users", e)
+            return []
+
+    def get_user(self, username) -> Optional[Dict]:
+        try:
+            return self.store.get_user(username)
+        except Exception as e:
+            report_error("Error getting user", e)
+            return None
 
     def add_user(self, username, password, role="student"):
-        data = self.load_data()
-        if 'users' not in data:
-            data['users'] = []
-        if any(u['username'] == username for u in data['users']):
+        # Don't pay for hashing when the name is obviously taken
+        if self.get_user(username) is not None:
             return False
-        data['users'].append({
+        user = {
             "username": username,
-            "password": password,
+            "password": passwords.hash_password(password),
             "role": role
-        })
-        self.save_data(data)
-        return True
+        }
+        # The store checks and appends atomically so two signups can't both
+        # claim the same username.
+        return self.store.add_user_if_absent(user)
 
     def validate_user(self, username, password):
-        users = self.get_users()
-        for user in users:
-            if user['username'] == username and user['password'] == password:
-                return user
-        return None
+        user = self.get_user(username)
+        if user is None or not passwords.verify_password(password, user.get('password', '')):
+            return None
+        if passwords.needs_rehash(user['password']):
+            user = dict(user, password=passwords.hash_password(password))
+            try:
+                self.store.update_users([user])
+            except Exception as e:
+                report_error("Error upgrading password hash", e)
+        return user
+
+    def migrate_passwords(self) -> int:
+        """Hash any plaintext passwords left in the users collection.
+
+        Not run on startup (each hash costs ~0.1 s; validate_user upgrades
+        entries one login at a time); see `python -m utils.passwords`."""
+        try:
+            legacy = [dict(u, password=passwords.hash_password(u.get('password', '')))
+                      for u in self.get_users() if not passwords.is_hashed(u.get('password', ''))]
+            if legacy:
+                self.store.update_users(legacy)
+            return len(legacy)
+        except Exception as e:
+            report_error("Error migrating passwords", e)
+            return 0
+    
+    def prepare_review(self, review_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in the timestamp and overall rating of a review if missing"""
+        # Add timestamp if not present
+        if 'timestamp' not in review_data:
+            review_data['timestamp'] = datetime.now().isoformat()
+        
+        # Calculate overall rating if not present
+        if 'overall' not in review_data:
+            ratings = []
+            for meal in ['breakfast', 'lunch', 'snacks', 'dinner']:
+                if meal in review_data and review_data[meal] is not None:
+                    ratings.append(review_data[meal])
+            
+            if ratings:
+                review_data['overall'] = sum(ratings) / len(ratings)
+            else:
+                review_data['overall'] = 0
+        return review_data
+    
+    def prepare_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Add creation timestamp if not present
+        if 'created_at' not in event_data:
+            event_data['created_at'] = datetime.now().isoformat()
+        return event_data
+    
+    def prepare_news(self, news_data: Dict[str, Any]) -> Dict[str, Any]:
+        # Add creation timestamp
+        if 'created_at' not in news_data:
+            news_data['created_at'] = datetime.now().isoformat()
+        
+        # Add date if not present
+        if 'date' not in news_data:
+            news_data['date'] = datetime.now().strftime('%Y-%m-%d')
+        return news_data
+    
+    def add_records(self, collection: str, records: List[Dict[str, Any]]) -> int:
+        """Add many reviews, events or news articles in a single write.
+        
+        Records get the same defaults as add_review/add_event/add_news.
+        Returns how many were written (0 if the write failed).
+        """
+        prepare = {'reviews': self.prepare_review, 'events': self.prepare_event,
+                   'news': self.prepare_news}[collection]
+        try:
+            prepared = [prepare(record) for record in records]
+            if prepared:
+                self.store.extend(collection, prepared)
+            return len(prepared)
+        except Exception as e:
+            report_error(f"Error adding {collection}", e)
+            return 0
     
     def add_review(self, review_data: Dict[str, Any]) -> bool:
         """Add a new review"""
         try:
-            data = self.load_data()
-            
-            # Add timestamp if not present
-            if 'timestamp' not in review_data:
-                review_data['timestamp'] = datetime.now().isoformat()
-            
-            # Calculate overall rating if not present
-            if 'overall' not in review_data:
-                ratings = []
-                for meal in ['breakfast', 'lunch', 'snacks', 'dinner']:
-                    if meal in review_data and review_data[meal] is not None:
-                        ratings.append(review_data[meal])
-                
-                if ratings:
-                    review_data['overall'] = sum(ratings) / len(ratings)
-                else:
-                    review_data['overall'] = 0
-            
-            data['reviews'].append(review_data)
-            return self.save_data(data)
+            self.store.append('reviews', self.prepare_review(review_data))
+            return True
             
         except Exception as e:
-            print(f"Error adding review: {e}")
+            report_error("Error adding review", e)
             return False
     
     def get_reviews(self, limit: Optional[int] = None) -> List[Dict]:
         """Get all reviews or limited number"""
         try:
-            data = self.load_data()
-            reviews = data.get('reviews', [])
-            
             if limit:
-                return reviews[-limit:]  # Get last N reviews
-            return reviews
+                return self.store.recent('reviews', limit)  # Get last N reviews
+            return self.store.records('reviews')
             
         except Exception as e:
-            print(f"Error getting reviews: {e}")
+            report_error("Error getting reviews", e)
             return []
     
+    def review_columns(self) -> ReviewColumns:
+        """All reviews as compact parallel arrays (shared; treat as read-only)"""
+        try:
+            return self.store.review_columns()
+        except Exception as e:
+            report_error("Error getting reviews", e)
+            return ReviewColumns()
+    
+    def iter_reviews(self, since_day: Optional[str] = None, until_day: Optional[str] = None,
+                     user: Optional[str] = None, chunk_size: int = 5000):
+        """Stream reviews in chunks, optionally limited to a day range
+        (YYYY-MM-DD, both inclusive) and one user"""
+        # A generator itself, so its timing covers the whole iteration
+        yield from self.store.iter_reviews(since_day, until_day, user, chunk_size)
+    
     def add_event(self, event_data):
         """Add a new event"""
         try:
-            data = self.load_data()
-            
-            # Add creation timestamp if not present
-            if 'created_at' not in event_data:
-                event_data['created_at'] = datetime.now().isoformat()
-            
-            # Ensure events list exists
-            if 'events' not in data:
-                data['events'] = []
-            
-            data['events'].append(event_data)
-            return self.save_data(data)
+            self.store.append('events', self.prepare_event(event_data))
+            return True
             
         except Exception as e:
-            print(f"Error adding event: {e}")
+            report_error("Error adding event", e)
             return False
 
     
-    def get_events(self) -> List[Dict]:
-        """Get all events"""
+    def get_events(self, offset: int = 0, limit: Optional[int] = None,
+                   category: Optional[str] = None) -> List[Dict]:
+        """Get events in publication order, optionally one category and one page of it"""
         try:
-            data = self.load_data()
-            return data.get('events', [])
+            if offset == 0 and limit is None and category is None:
+                return self.store.records('events')
+            return self.store.page('events', offset, limit, category)
         except Exception as e:
-            print(f"Error getting events: {e}")
+            report_error("Error getting events", e)
+            return []
+    
+    def count_events(self, category: Optional[str] = None) -> int:
+        try:
+            return self.store.count('events', category)
+        except Exception as e:
+            report_error("Error counting events", e)
+            return 0
+    
+    def search_events(self, query: str) -> List[Dict]:
+        """Events matching `query` in title, organizer or description, best first"""
+        try:
+            return search.search(self, 'events', query)
+        except Exception as e:
+            report_error("Error searching events", e)
             return []
     
     def add_news(self, news_data: Dict[str, Any]) -> bool:
         """Add a new news article"""
         try:
-            data = self.load_data()
-            
-            # Add creation timestamp
-            if 'created_at' not in news_data:
-                news_data['created_at'] = datetime.now().isoformat()
-            
-            # Add date if not present
-            if 'date' not in news_data:
-                news_data['date'] = datetime.now().strftime('%Y-%m-%d')
-            
-            data['news'].append(news_data)
-            return self.save_data(data)
+            self.store.append('news', self.prepare_news(news_data))
+            return True
             
         except Exception as e:
-            print(f"Error adding news: {e}")
+            report_error("Error adding news", e)
             return False
     
     def get_news(self) -> List[Dict]:
         """Get all news articles"""
         try:
-            data = self.load_data()
-            return data.get('news', [])
+            return self.store.records('news')
         except Exception as e:
-            print(f"Error getting news: {e}")
+            report_error("Error getting news", e)
+            return []
+    
+    def get_news_page(self, before: Optional[Tuple[str, int]] = None,
+                      limit: Optional[int] = None) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """Get up to `limit` news articles newest first, starting after the
+        `before` cursor. Also returns the cursor of the next page, or None."""
+        try:
+            return self.store.newest('news', limit, before)
+        except Exception as e:
+            report_error("Error getting news", e)
+            return [], None
+    
+    def search_news(self, query: str) -> List[Dict]:
+        """News articles matching `query` in title or content, best first"""
+        try:
+            return search.search(self, 'news', query)
+        except Exception as e:
+            report_error("Error searching news", e)
             return []
     
     def has_rated_today(self, user_id: str) -> bool:
         """Check if user has already rated today"""
         try:
-            reviews = self.get_reviews()
             today = datetime.now().strftime('%Y-%m-%d')
-            
-            for review in reviews:
-                review_date = review.get('timestamp', '')[:10]  # Get date part
-                if review.get('user') == user_id and review_date == today:
-                    return True
-            
-            return False
+            return self.store.has_review_on(user_id, today)
             
         except Exception as e:
-            print(f"Error checking daily rating: {e}")
+            report_error("Error checking daily rating", e)
             return False
     
     def get_average_ratings(self, days: int = 7) -> Dict[str, float]:
         """Get average ratings for the last N days"""
         try:
-            reviews = self.get_reviews()
-            
-            if not reviews:
-                return {
-                    'breakfast': 0,
-                    'lunch': 0,
-                    'snacks': 0,
-                    'dinner': 0,
-                    'overall': 0
-                }
-            
-            # Filter reviews from last N days
-            cutoff_date = datetime.now() - timedelta(days=days)
-            recent_reviews = []
-            
-            for review in reviews:
-                try:
-                    review_date = datetime.fromisoformat(review.get('timestamp', ''))
-                    if review_date >= cutoff_date:
-                        recent_reviews.append(review)
-                except:
-                    continue
-            
-            if not recent_reviews:
-                return {
-                    'breakfast': 0,
-                    'lunch': 0,
-                    'snacks': 0,
-                    'dinner': 0,
-                    'overall': 0
-                }
-            
-            # Calculate averages
-            averages = {}
-            for meal in ['breakfast', 'lunch', 'snacks', 'dinner', 'overall']:
-                ratings = [r.get(meal, 0) for r in recent_reviews if r.get(meal) is not None]
-                averages[meal] = sum(ratings) / len(ratings) if ratings else 0
-            
-            return averages
+            # Reviews from the last N calendar days (today included)
+            since_day = first_day_of_last(days)
+            return self.store.rating_averages(since_day)
             
         except Exception as e:
-            print(f"Error calculating averages: {e}")
+            report_error("Error calculating averages", e)
             return {
                 'breakfast': 0,
                 'lunch': 0,
@@ -262,41 +370,21 @@ class SimpleDataManager:
     def get_stats(self) -> Dict[str, Any]:
         """Get general statistics"""
         try:
-            data = self.load_data()
-            
-            reviews = data.get('reviews', [])
-            events = data.get('events', [])
-            news = data.get('news', [])
-            
-            # Get unique users
-            unique_users = set()
-            for review in reviews:
-                if review.get('user'):
-                    unique_users.add(review.get('user'))
-            
-            # Get recent reviews (last 7 days)
-            recent_reviews = []
-            cutoff_date = datetime.now() - timedelta(days=7)
-            
-            for review in reviews:
-                try:
-                    review_date = datetime.fromisoformat(review.get('timestamp', ''))
-                    if review_date >= cutoff_date:
-                        recent_reviews.append(review)
-                except:
-                    continue
+            # Review figures, with "recent" meaning the last 7 calendar days (today included)
+            since_day = first_day_of_last(7)
+            stats = self.store.review_stats(since_day)
             
             return {
-                'total_reviews': len(reviews),
-                'total_events': len(events),
-                'total_news': len(news),
-                'active_users': len(unique_users),
-                'recent_reviews': len(recent_reviews),
-                'avg_rating': sum(r.get('overall', 0) for r in reviews) / len(reviews) if reviews else 0
+                'total_reviews': stats['total_reviews'],
+                'total_events': self.store.count('events'),
+                'total_news': self.store.count('news'),
+                'active_users': stats['active_users'],
+                'recent_reviews': stats['recent_reviews'],
+                'avg_rating': stats['avg_rating']
             }
             
         except Exception as e:
-            print(f"Error getting stats: {e}")
+            report_error("Error getting stats", e)
             return {
                 'total_reviews': 0,
                 'total_events': 0,
@@ -305,10 +393,3 @@ class SimpleDataManager:
                 'recent_reviews': 0,
                 'avg_rating': 0
             }
-        
-    
-        
-
-
-# Add missing import for timedelta
-from datetime import timedelta
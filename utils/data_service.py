@@ -0,0 +1,23 @@
+"""The data manager shared by every Streamlit session
+
+Pages used to build a fresh SimpleDataManager per component on every rerun,
+each re-checking the data file. One instance per data file now lives for
+the whole server process (st.cache_resource) and app.py hands it to every
+page. The parsed data, indexes and journal write queue behind it are
+already process-wide, so sharing it across sessions is safe.
+
+KHOLLPOLL_DATA points the app at another data file (benchmarks use it).
+"""
+import os
+
+import streamlit as st
+
+from utils.data_manager import SimpleDataManager
+
+DATA_PATH = os.environ.get("KHOLLPOLL_DATA", "data/reviews.json")
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_manager(file_path: str = DATA_PATH) -> SimpleDataManager:
+    """The process-wide SimpleDataManager for `file_path`"""
+    return SimpleDataManager(file_path)
@@ -0,0 +1,130 @@
+"""Streaming export of reviews to CSV, JSONL or Parquet
+
+Reviews are pulled from the store in chunks and written out chunk by
+chunk, so memory use stays flat however long the history is. Parquet
+needs pyarrow; CSV and JSONL only need the standard library.
+
+    python -m utils.export reviews.csv
+    python -m utils.export reviews.parquet --since 2024-01-01 --until 2024-05-31 --user E22CSEU1156
+"""
+import argparse
+import csv
+import importlib.util
+import io
+import json
+import os
+import sys
+from datetime import datetime
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+from utils.data_manager import SimpleDataManager
+
+# Parquet export is optional; pyarrow is only imported once it is used
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+FIELDS = ['user'] + MEALS + ['overall', 'comments', 'timestamp']
+FORMATS = ('csv', 'jsonl', 'parquet')
+CHUNK_SIZE = 5000
+
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in FORMATS if fmt != 'parquet' or HAS_PYARROW]
+
+
+def _write_csv(chunks: Iterable[List[Dict[str, Any]]], out: IO[bytes]) -> int:
+    text = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+    writer = csv.DictWriter(text, fieldnames=FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    written = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        written += len(chunk)
+    text.detach()  # Leave `out` open for the caller
+    return written
+
+
+def _write_jsonl(chunks: Iterable[List[Dict[str, Any]]], out: IO[bytes]) -> int:
+    written = 0
+    for chunk in chunks:
+        out.write(''.join(json.dumps(review, ensure_ascii=False) + '\n' for review in chunk).encode('utf-8'))
+        written += len(chunk)
+    return written
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def _write_parquet(chunks: Iterable[List[Dict[str, Any]]], out: IO[bytes]) -> int:
+    if not HAS_PYARROW:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([('user', pa.string())]
+                       + [(meal, pa.float32()) for meal in MEALS]
+                       + [('overall', pa.float32()), ('comments', pa.string()),
+                          ('timestamp', pa.timestamp('us'))])
+    written = 0
+    with pq.ParquetWriter(out, schema) as writer:
+        for chunk in chunks:
+            columns = {
+                'user': [review.get('user') for review in chunk],
+                'comments': [review.get('comments') for review in chunk],
+                'timestamp': [_timestamp(review.get('timestamp')) for review in chunk],
+            }
+            for field in MEALS + ['overall']:
+                columns[field] = [_number(review.get(field)) for review in chunk]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            written += len(chunk)
+    return written
+
+
+WRITERS = {'csv': _write_csv, 'jsonl': _write_jsonl, 'parquet': _write_parquet}
+
+
+def export_reviews(dm: SimpleDataManager, out: IO[bytes], file_format: str,
+                   since_day: Optional[str] = None, until_day: Optional[str] = None,
+                   user: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> int:
+    """Write the matching reviews to the binary stream `out`; returns how many"""
+    if file_format not in WRITERS:
+        raise ValueError(f"Unsupported export format: {file_format!r} (use {', '.join(FORMATS)})")
+    return WRITERS[file_format](dm.iter_reviews(since_day, until_day, user, chunk_size), out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export reviews to CSV, JSONL or Parquet.")
+    parser.add_argument('path', help="output file; the format is taken from its extension")
+    parser.add_argument('--data', default="data/reviews.json", help="data file to export from")
+    parser.add_argument('--format', choices=FORMATS)
+    parser.add_argument('--since', help="first day to include (YYYY-MM-DD)")
+    parser.add_argument('--until', help="last day to include (YYYY-MM-DD)")
+    parser.add_argument('--user', help="only this user's reviews")
+    args = parser.parse_args(argv)
+
+    file_format = args.format or os.path.splitext(args.path)[1].lstrip('.').lower()
+    if file_format not in available_formats():
+        parser.error(f"cannot export {file_format!r}; available formats: {', '.join(available_formats())}")
+    dm = SimpleDataManager(args.data)
+    with open(args.path, 'wb') as out:
+        count = export_reviews(dm, out, file_format, args.since, args.until, args.user)
+    print(f"Exported {count} reviews to {args.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
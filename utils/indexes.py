@@ -0,0 +1,240 @@
+"""In-memory indexes over the stored collections
+
+Stores build these once per loaded data version and then feed every newly
+appended record through ``add(collection, record)``, so lookups never have
+to rescan the full history.
+"""
+from bisect import bisect_left, insort
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.review_columns import MEALS, MISSING_RATING, ReviewColumns
+
+# Rated fields, in the order they are laid out in a day bucket
+FIELDS = ['breakfast', 'lunch', 'snacks', 'dinner', 'overall']
+
+
+def review_day(review: Dict[str, Any]) -> Optional[str]:
+    """YYYY-MM-DD day a review belongs to, or None if its timestamp is unusable.
+
+    Only timestamps starting with a canonical YYYY-MM-DD date count: other
+    forms date.fromisoformat() accepts (20240501T1010, 2024-W18-3) would
+    not sort or slice into days and months like the rest."""
+    timestamp = review.get('timestamp')
+    if not isinstance(timestamp, str):
+        return None
+    day = timestamp[:10]  # Get date part
+    try:
+        if date.fromisoformat(day).isoformat() == day:
+            return day
+    except ValueError:
+        pass
+    return None
+
+
+def averages_from_sums(sums: List[float]) -> Dict[str, float]:
+    """Per-field averages from DailyAggregates.sums() output"""
+    return {field: sums[2 * i] / sums[2 * i + 1] if sums[2 * i + 1] else 0
+            for i, field in enumerate(FIELDS)}
+
+
+class DailyAggregates:
+    """Running per-day review aggregates.
+
+    Each day bucket holds the review count followed by a (sum, count) pair per
+    rated field, plus the set of users who reviewed that day. Recent averages
+    and stats are then sums over at most N buckets, and "has this user rated
+    on day D" is a set lookup.
+    """
+
+    def __init__(self):
+        self.days: Dict[str, List[float]] = {}
+        self.day_users: Dict[str, Set[Any]] = {}
+        self._sorted_days: List[str] = []
+        self.users: Set[Any] = set()
+        self.total_reviews = 0
+        self.overall_total = 0.0
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'DailyAggregates':
+        aggregates = cls()
+        reviews = data.get('reviews', [])
+        if isinstance(reviews, ReviewColumns):
+            aggregates.add_columns(reviews)
+        else:
+            for review in reviews:
+                aggregates.add('reviews', review)
+        return aggregates
+
+    def _bucket(self, day: str) -> List[float]:
+        bucket = self.days.get(day)
+        if bucket is None:
+            bucket = self.days[day] = [0] * (1 + 2 * len(FIELDS))
+            self.day_users[day] = set()
+            insort(self._sorted_days, day)
+        return bucket
+
+    def add(self, collection: str, record: Dict[str, Any]):
+        if collection != 'reviews':
+            return
+
+        user = record.get('user')
+        if user:
+            self.users.add(user)
+        self.total_reviews += 1
+        self.overall_total += record.get('overall') or 0
+
+        day = review_day(record)
+        if day is None:
+            return
+        bucket = self._bucket(day)
+        bucket[0] += 1
+        for i, field in enumerate(FIELDS):
+            value = record.get(field)
+            if value is not None:
+                bucket[1 + 2 * i] += value
+                bucket[2 + 2 * i] += 1
+        self.day_users[day].add(user)
+
+    def add_columns(self, columns: ReviewColumns):
+        """add() every review of `columns`, reading days and ratings straight
+        from the arrays instead of building and re-parsing a dict per review"""
+        meals = [columns.meals[meal] for meal in MEALS]
+        overall = columns.overall
+        for row in range(len(columns)):
+            if row in columns.overflow:
+                self.add('reviews', columns.overflow[row])
+                continue
+
+            user = columns.user(row)
+            if user:
+                self.users.add(user)
+            self.total_reviews += 1
+            value = overall[row]
+            rated = value == value  # NaN marks a missing overall rating
+            if rated:
+                self.overall_total += value
+
+            day = columns.day(row)
+            if day is None:
+                continue
+            bucket = self._bucket(day)
+            bucket[0] += 1
+            for i, ratings in enumerate(meals):
+                rating = ratings[row]
+                if rating != MISSING_RATING:
+                    bucket[1 + 2 * i] += rating
+                    bucket[2 + 2 * i] += 1
+            if rated:
+                bucket[-2] += value
+                bucket[-1] += 1
+            self.day_users[day].add(user)
+
+    def contains(self, day: str, user_id: Any) -> bool:
+        return user_id in self.day_users.get(day, ())
+
+    def _days_since(self, since_day: str) -> List[str]:
+        return self._sorted_days[bisect_left(self._sorted_days, since_day):]
+
+    def sums(self, since_day: str) -> List[float]:
+        """(sum, count) of each rated field over reviews on or after
+        `since_day`, flattened in FIELDS order"""
+        sums = [0] * (2 * len(FIELDS))
+        for day in self._days_since(since_day):
+            bucket = self.days[day]
+            for i in range(len(sums)):
+                sums[i] += bucket[1 + i]
+        return sums
+
+    def averages(self, since_day: str) -> Dict[str, float]:
+        """Average of each rated field over reviews on or after `since_day`"""
+        return averages_from_sums(self.sums(since_day))
+
+    def recent_reviews(self, since_day: str) -> int:
+        return sum(self.days[day][0] for day in self._days_since(since_day))
+
+    def stats(self, since_day: str) -> Dict[str, Any]:
+        return {
+            'total_reviews': self.total_reviews,
+            'active_users': len(self.users),
+            'recent_reviews': self.recent_reviews(since_day),
+            'avg_rating': self.overall_total / self.total_reviews if self.total_reviews else 0
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'days': {day: bucket + [sorted(self.day_users[day], key=str)]
+                     for day, bucket in self.days.items()},
+            'users': sorted(self.users, key=str),
+            'total_reviews': self.total_reviews,
+            'overall_total': self.overall_total,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> 'DailyAggregates':
+        aggregates = cls()
+        for day, bucket in payload['days'].items():
+            aggregates.days[day] = bucket[:-1]
+            aggregates.day_users[day] = set(bucket[-1])
+        aggregates._sorted_days = sorted(aggregates.days)
+        aggregates.users = set(payload['users'])
+        aggregates.total_reviews = payload['total_reviews']
+        aggregates.overall_total = payload['overall_total']
+        return aggregates
+
+
+class ListingIndex:
+    """Record positions for paged listings: events and news by category, and
+    news ordered newest first (ties keep publication order)"""
+
+    def __init__(self):
+        self.counts = {'events': 0, 'news': 0}
+        self.categories: Dict[str, Dict[Any, List[int]]] = {'events': {}, 'news': {}}
+        self.news_keys: List[Tuple[str, int]] = []  # (date, -position), ascending
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'ListingIndex':
+        listing = cls()
+        for collection in ('events', 'news'):
+            for record in data.get(collection, []):
+                listing.add(collection, record)
+        return listing
+
+    def add(self, collection: str, record: Dict[str, Any]):
+        if collection not in self.counts:
+            return
+        position = self.counts[collection]
+        self.counts[collection] += 1
+        self.categories[collection].setdefault(record.get('category'), []).append(position)
+        if collection == 'news':
+            insort(self.news_keys, (str(record.get('date') or ''), -position))
+
+    def positions(self, collection: str, category: Any) -> List[int]:
+        return self.categories[collection].get(category, [])
+
+    def newest_news(self, before: Optional[Tuple[str, int]], limit: Optional[int]) -> List[Tuple[str, int]]:
+        """(date, position) of up to `limit` articles after the `before` cursor"""
+        end = len(self.news_keys) if before is None else bisect_left(self.news_keys, (before[0], -before[1]))
+        start = 0 if limit is None else max(0, end - limit)
+        return [(day, -negated) for day, negated in reversed(self.news_keys[start:end])]
+
+
+class UserIndex:
+    """Users keyed by username (the first record wins, like a linear scan)"""
+
+    def __init__(self):
+        self.users: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> 'UserIndex':
+        index = cls()
+        for user in data.get('users', []):
+            index.add('users', user)
+        return index
+
+    def add(self, collection: str, record: Dict[str, Any]):
+        if collection == 'users':
+            self.users.setdefault(record.get('username'), record)
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        return self.users.get(username)
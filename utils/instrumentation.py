@@ -0,0 +1,241 @@
+"""Process-wide counters and latency histograms for hot paths
+
+    @timed('page.home')            # decorator
+    with timed('charts.build'):    # or context manager
+        ...
+    count_bytes('json_store.read', len(chunk))
+
+Every SimpleDataManager method is timed (see `instrumented`), as are page
+renders and the header. Results show up on the admin Diagnostics page and
+can be dumped with `snapshot()` / `to_json()`.
+
+Code that handles its own exceptions reports them with `report_error()`,
+which prints them and counts them against the innermost timed call.
+
+Off unless KHOLLPOLL_METRICS=1 or switched on with `set_enabled(True)`;
+while off, a timed call costs one flag check.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+ENABLED = os.environ.get('KHOLLPOLL_METRICS', '') not in ('', '0', 'false')
+
+# Upper bounds (ms) of the latency histogram buckets; the last is unbounded
+BUCKETS_MS = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf')]
+
+_lock = threading.Lock()
+_timings: Dict[str, 'Timing'] = {}
+_bytes: Dict[str, int] = {}
+_started = time.time()
+
+# Per thread: one "failed" flag per timed call in progress, innermost last
+_active = threading.local()
+
+
+class Timing:
+    """Call count, errors and latency histogram of one timed operation"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def record(self, seconds: float, failed: bool = False):
+        milliseconds = seconds * 1000
+        self.count += 1
+        self.errors += failed
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+        self.buckets[bisect_left(BUCKETS_MS, milliseconds)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of calls"""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return round(min(bound, self.max), 3)
+        return round(self.max, 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': round(self.total, 3),
+            'mean_ms': round(self.total / self.count, 3) if self.count else 0,
+            'p50_ms': self.percentile(0.5),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max, 3),
+            'histogram': {('inf' if bound == float('inf') else str(bound)): count
+                          for bound, count in zip(BUCKETS_MS, self.buckets) if count},
+        }
+
+
+def set_enabled(enabled: bool):
+    global ENABLED
+    ENABLED = enabled
+
+
+def is_enabled() -> bool:
+    return ENABLED
+
+
+def record(name: str, seconds: float, failed: bool = False):
+    with _lock:
+        timing = _timings.get(name)
+        if timing is None:
+            timing = _timings[name] = Timing()
+        timing.record(seconds, failed)
+
+
+def _begin():
+    calls = getattr(_active, 'calls', None)
+    if calls is None:
+        calls = _active.calls = []
+    calls.append(False)
+
+
+def _end() -> bool:
+    """Pop the innermost timed call; True if it reported an error"""
+    return _active.calls.pop()
+
+
+def report_error(message: str, error: BaseException):
+    """Print a handled error and count it against the innermost timed call,
+    so functions that catch their own exceptions still show up as failing"""
+    print(f"{message}: {error}")
+    calls = getattr(_active, 'calls', None)
+    if calls:
+        calls[-1] = True
+
+
+def count_bytes(name: str, amount: int):
+    """Add to a bytes-read/written counter (no-op while disabled)"""
+    if ENABLED:
+        with _lock:
+            _bytes[name] = _bytes.get(name, 0) + amount
+
+
+class timed:
+    """Time a block (`with timed(name):`) or every call of a function (`@timed(name)`)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._start: Optional[float] = None
+
+    def __enter__(self):
+        self._start = None
+        if ENABLED:
+            _begin()
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is not None:
+            elapsed = time.perf_counter() - self._start
+            record(self.name, elapsed, _end() or exc_type is not None)
+        return False
+
+    def __call__(self, function):
+        name = self.name
+        if inspect.isgeneratorfunction(function):
+            return _timed_generator(name, function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            _begin()
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = function(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                record(name, elapsed, _end() or failed)
+        return wrapper
+
+
+def _timed_generator(name: str, function):
+    """Time the iteration of a generator function, not just its creation:
+    the time spent producing items, with errors raised while iterating"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        iterator = function(*args, **kwargs)
+        if not ENABLED:
+            return (yield from iterator)
+        elapsed = 0.0
+        failed = True
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration as stop:
+                    failed = False
+                    return stop.value
+                finally:
+                    elapsed += time.perf_counter() - start
+                try:
+                    yield item
+                except GeneratorExit:
+                    # The consumer stopped early; that is not a failure
+                    failed = False
+                    iterator.close()
+                    raise
+        finally:
+            record(name, elapsed, failed)
+    return wrapper
+
+
+def instrumented(prefix: str):
+    """Class decorator timing every public method as `<prefix>.<method>`
+    (generator methods: the whole iteration)"""
+    def decorate(cls):
+        for attribute, value in list(vars(cls).items()):
+            if callable(value) and not attribute.startswith('_'):
+                setattr(cls, attribute, timed(f"{prefix}.{attribute}")(value))
+        return cls
+    return decorate
+
+
+def snapshot() -> Dict[str, Any]:
+    """Everything recorded so far, as plain JSON-able data"""
+    with _lock:
+        return {
+            'enabled': ENABLED,
+            'since': _started,
+            'timings': {name: timing.to_dict() for name, timing in sorted(_timings.items())},
+            'bytes': dict(sorted(_bytes.items())),
+        }
+
+
+def to_json() -> str:
+    return json.dumps(snapshot(), indent=2)
+
+
+def reset():
+    global _started
+    with _lock:
+        _timings.clear()
+        _bytes.clear()
+        _started = time.time()
+
+
+def rows() -> List[Dict[str, Any]]:
+    """One flat row per timed operation, slowest total first (for tables)"""
+    timings = snapshot()['timings']
+    return sorted(({'name': name, **{key: value for key, value in timing.items() if key != 'histogram'}}
+                   for name, timing in timings.items()),
+                  key=lambda row: row['total_ms'], reverse=True)
@@ -0,0 +1,704 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
+
+from utils.indexes import DailyAggregates, ListingIndex, UserIndex
+from utils.instrumentation import count_bytes
+from utils.lazy_json import LazyDocument
+from utils.review_columns import ReviewColumns
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available
+    fcntl = None
+
+# Collections that can be appended to through a journal
+COLLECTIONS = ('reviews', 'events', 'news', 'users')
+
+# Fold the journals back into the snapshot once this many records piled up
+COMPACT_AFTER = 1000
+
+# Snapshot key recording which generation of journals belongs to it
+GENERATION_KEY = 'journal_generation'
+
+# Collections every document has, even if the file lacks them
+REQUIRED_COLLECTIONS = ('reviews', 'events', 'news')
+
+# Parse each collection of the snapshot only when it is first used. Needs
+# POSIX semantics: the snapshot stays open while others replace it.
+LAZY_LOADING = fcntl is not None and hasattr(os, 'pread')
+
+# In-memory collection types (reviews are kept column-wise, see ReviewColumns)
+SEQUENCE_TYPES = (list, ReviewColumns)
+
+
+class _CachedDocument:
+    """Parsed snapshot plus everything replayed from its journals so far.
+
+    With a lazy snapshot, collections are parsed on first use; journal
+    records of collections not parsed yet wait in `pending`.
+    """
+
+    def __init__(self, signature: Tuple[int, int, int], generation: int, data: Dict[str, Any],
+                 lazy: Optional[LazyDocument] = None, required: Tuple[str, ...] = REQUIRED_COLLECTIONS):
+        self.signature = signature
+        self.generation = generation
+        self.data = data
+        if isinstance(data.get('reviews'), list):
+            data['reviews'] = ReviewColumns.from_records(data['reviews'])
+        self.lazy = lazy
+        self.required = required
+        self.pending: Dict[str, List[Dict[str, Any]]] = {}
+        self.journal_offsets: Dict[str, int] = {}
+        self.journal_entries = 0
+        # How many records of each parsed collection came from the snapshot
+        # itself (the rest were replayed)
+        self.snapshot_counts = {key: len(value) for key, value in data.items()
+                                if isinstance(value, SEQUENCE_TYPES)}
+        # Derived lookup structures, built on first use and kept up to date
+        # as journal records are replayed
+        self.indexes: Dict[str, Any] = {}
+
+    def collection(self, name: str) -> Any:
+        """The records of `name`, parsing them from the snapshot if needed"""
+        records = self.data.get(name)
+        if records is None:
+            if self.lazy is None or name not in self.lazy:
+                records = ReviewColumns() if name == 'reviews' else []
+            elif name == 'reviews':
+                records = ReviewColumns.from_records(self.lazy.iter_records(name))
+            else:
+                records = self.lazy.load(name)
+            if isinstance(records, SEQUENCE_TYPES):
+                self.snapshot_counts[name] = len(records)
+                records.extend(self.pending.pop(name, []))
+            self.data[name] = records
+        return records
+
+    def document(self) -> Dict[str, Any]:
+        """The whole document, parsing whatever is still lazy"""
+        if self.lazy is not None:
+            for name in self.lazy.keys():
+                if name != GENERATION_KEY:
+                    self.collection(name)
+            for name in list(self.pending):
+                self.collection(name)
+            self.lazy = None
+        for name in self.required:
+            self.collection(name)
+        return self.data
+
+    def journal_records(self, name: str) -> List[Dict[str, Any]]:
+        """Records of `name` that came from the journals, not the snapshot"""
+        if name in self.data:
+            return self.data[name][self.snapshot_counts.get(name, 0):]
+        return self.pending.get(name, [])
+
+    def recent(self, name: str, limit: int) -> List[Dict[str, Any]]:
+        """The last `limit` records of `name`, read from the end of the
+        snapshot without parsing the collection if it is still lazy"""
+        if name in self.data or self.lazy is None or name not in self.lazy:
+            return self.collection(name)[-limit:]
+        pending = self.pending.get(name, [])
+        if len(pending) >= limit:
+            return pending[-limit:]
+        return self.lazy.tail(name, limit - len(pending)) + pending
+
+    def index(self, name: str, build: Callable[[Any], Any]):
+        """Return the named index, building it from the data if needed"""
+        if name not in self.indexes:
+            self.indexes[name] = build(_Collections(self))
+        return self.indexes[name]
+
+
+class _Collections:
+    """Read-only mapping over a cached document that parses lazy
+    collections as they are looked up (what index builders get)"""
+
+    def __init__(self, cached: _CachedDocument):
+        self._cached = cached
+
+    def __getitem__(self, name: str) -> Any:
+        return self._cached.collection(name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self._cached.collection(name)
+
+
+# Process-wide cache of parsed data files, shared by every session and every
+# store instance. Maps absolute snapshot path -> _CachedDocument.
+_cache_lock = threading.RLock()
+_data_cache: Dict[str, _CachedDocument] = {}
+
+
+def _file_signature(path: str) -> Tuple[int, int, int]:
+    """Cheap change detector for a data file: (mtime_ns, size, inode)"""
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _copy_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shallow copy of a document so callers can't mutate the cached lists"""
+    return {key: value.copy() if isinstance(value, SEQUENCE_TYPES) else value
+            for key, value in data.items()}
+
+
+def _next_day(day: str) -> str:
+    return (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def clear_cache():
+    """Drop every cached document (mainly useful for scripts and benchmarks)"""
+    with _cache_lock:
+        _data_cache.clear()
+
+
+# Writers of one data file queue on its own re-entrant lock, then on the
+# advisory file lock, without holding _cache_lock: readers of every store
+# keep going while a write (or a wait on another process) is in progress.
+_writer_locks: Dict[str, threading.RLock] = {}
+_writer_locks_lock = threading.Lock()
+
+# Advisory locks currently held by this process: lock path -> (handle, depth).
+# Only touched by the thread holding that path's writer lock.
+_file_locks: Dict[str, Tuple[Any, int]] = {}
+
+
+def _writer_lock(lock_path: str) -> threading.RLock:
+    with _writer_locks_lock:
+        lock = _writer_locks.get(lock_path)
+        if lock is None:
+            lock = _writer_locks[lock_path] = threading.RLock()
+        return lock
+
+
+def _fsync_directory(path: str):
+    """Make a rename or file creation inside `path` durable (POSIX only)"""
+    if os.name != 'posix':
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _dump_document(f, document: Dict[str, Any]):
+    """Write exactly what json.dump(document, f, indent=2) would, one record
+    at a time, so column-stored collections never become one big list"""
+    if not document:
+        f.write('{}')
+        return
+    for i, (key, value) in enumerate(document.items()):
+        f.write(('{\n' if i == 0 else ',\n') + f'  {json.dumps(key, ensure_ascii=False)}: ')
+        if isinstance(value, SEQUENCE_TYPES) and len(value):
+            for j, record in enumerate(value):
+                body = json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+                f.write(('[\n    ' if j == 0 else ',\n    ') + body)
+            f.write('\n  ]')
+        else:
+            f.write(json.dumps(list(value) if isinstance(value, SEQUENCE_TYPES) else value,
+                               indent=2, ensure_ascii=False).replace('\n', '\n  '))
+    f.write('\n}')
+
+
+# Reading the umask means setting it; do that once, before any threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path: str) -> int:
+    """Permissions for a rewrite of `path`: the current file's, or what a
+    plain open() would give a new file"""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def _write_atomically(path: str, payload: Any, indent: Optional[int] = None):
+    """Write JSON to a temp file and swap it in with os.replace, so readers
+    see either the old or the new file, never a truncated one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        # mkstemp creates the file 0600, and os.replace would keep that
+        os.chmod(tmp_path, _file_mode(path))
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            if indent == 2 and isinstance(payload, dict):
+                _dump_document(f, payload)
+            else:
+                json.dump(payload, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+            count_bytes('json_store.write', os.fstat(f.fileno()).st_size)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+class _GroupCommitter:
+    """Batch concurrent journal appends so they share one write and one fsync.
+
+    The first thread to arrive becomes the leader and flushes everything that
+    queued up while the previous batch was being written; the others just wait
+    for their batch to be reported durable.
+    """
+
+    def __init__(self, flush: Callable[[List[Tuple[str, str]]], None]):
+        self._flush = flush
+        self._cond = threading.Condition()
+        self._pending: List[Dict[str, Any]] = []
+        self._flushing = False
+
+    def submit(self, collection: str, line: str):
+        ticket = {'item': (collection, line), 'done': False, 'error': None}
+        with self._cond:
+            self._pending.append(ticket)
+            while not ticket['done']:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+
+                self._flushing = True
+                batch, self._pending = self._pending, []
+                error = None
+                self._cond.release()
+                try:
+                    self._flush([t['item'] for t in batch])
+                except Exception as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                    for t in batch:
+                        t['done'] = True
+                        t['error'] = error
+                    self._flushing = False
+                    self._cond.notify_all()
+
+        if ticket['error'] is not None:
+            raise ticket['error']
+
+
+_committers: Dict[str, _GroupCommitter] = {}
+_committers_lock = threading.Lock()
+
+
+class JsonStore:
+    """JSON snapshot plus per-collection append-only journals
+
+    Data lives in a snapshot (``data/reviews.json``) plus one append-only
+    JSONL journal per collection (``data/reviews.<collection>.<generation>.jsonl``).
+    Adding a record appends a single line; once enough records have piled up
+    the journals are compacted into a new snapshot generation.
+
+    Per-day review aggregates for each snapshot are persisted next to it in
+    ``data/reviews.aggregates.json``, tagged with the snapshot's generation
+    and file signature so a replaced or hand-edited snapshot is never
+    served stale aggregates.
+
+    `collections` limits the file to some collections (ShardedStore keeps
+    one file per collection).
+    """
+
+    def __init__(self, file_path: str, collections: Tuple[str, ...] = COLLECTIONS):
+        self.file_path = file_path
+        self.collections = collections
+        self.required = tuple(name for name in REQUIRED_COLLECTIONS if name in collections)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.file_path)
+
+    def journal_path(self, collection: str, generation: int) -> str:
+        """Path of the journal holding records appended to a snapshot generation"""
+        base = os.path.splitext(self.file_path)[0]
+        return f"{base}.{collection}.{generation}.jsonl"
+
+    @property
+    def aggregates_path(self) -> str:
+        return os.path.splitext(self.file_path)[0] + '.aggregates.json'
+
+    def load(self) -> Dict[str, List]:
+        """Return the shared parsed document, re-reading only if the file changed.
+
+        The returned object is shared across sessions and must not be mutated.
+        """
+        with _cache_lock:
+            return self._cached_document().document()
+
+    def _cached_document(self) -> _CachedDocument:
+        """Snapshot from the cache (re-parsed if it changed) with journals replayed"""
+        key = os.path.abspath(self.file_path)
+        signature = _file_signature(self.file_path)
+        with _cache_lock:
+            cached = _data_cache.get(key)
+            if cached is None or cached.signature != signature:
+                lazy = LazyDocument.open(self.file_path) if LAZY_LOADING else None
+                if lazy is not None:
+                    # Only the span offsets are read; collections parse on use
+                    stat = os.fstat(lazy.fd)
+                    signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+                    generation = lazy.load(GENERATION_KEY) if GENERATION_KEY in lazy else 0
+                    cached = _CachedDocument(signature, generation, {}, lazy, self.required)
+                else:
+                    with open(self.file_path, 'r', encoding='utf-8') as f:
+                        # The snapshot may have been replaced since we stat'ed it;
+                        # remember the signature of what we actually parse.
+                        stat = os.fstat(f.fileno())
+                        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+                        data = json.load(f)
+                        count_bytes('json_store.read', stat.st_size)
+                    generation = data.pop(GENERATION_KEY, 0)
+                    cached = _CachedDocument(signature, generation, data, required=self.required)
+                    # Ensure all required keys exist
+                    cached.document()
+                _data_cache[key] = cached
+
+            self._replay_journals(cached)
+            return cached
+
+    def _replay_journals(self, cached: _CachedDocument):
+        """Apply journal lines written since the last replay (by any process)"""
+        for collection in self.collections:
+            path = self.journal_path(collection, cached.generation)
+            offset = cached.journal_offsets.get(collection, 0)
+            try:
+                if os.path.getsize(path) <= offset:
+                    continue
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    chunk = f.read()
+                count_bytes('json_store.read', len(chunk))
+            except FileNotFoundError:
+                continue
+
+            # A line without its newline is still being written; leave it
+            # for the next replay.
+            complete = chunk[:chunk.rfind(b'\n') + 1]
+            records = cached.data.get(collection)
+            if records is None:
+                records = cached.pending.setdefault(collection, [])
+            for line in complete.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Skipping corrupt journal line in {path}: {e}")
+                    continue
+                records.append(record)
+                cached.journal_entries += 1
+                for index in cached.indexes.values():
+                    index.add(collection, record)
+            cached.journal_offsets[collection] = offset + len(complete)
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the data file for a read-modify-write.
+
+        Takes this file's writer lock and an advisory ``fcntl`` lock on
+        ``<file>.lock`` so other processes serving the app wait their turn.
+        Readers are not blocked; _cache_lock is only taken briefly to read
+        or swap the cached state.
+        """
+        lock_path = os.path.abspath(self.file_path + '.lock')
+        with _writer_lock(lock_path):
+            handle, depth = _file_locks.get(lock_path, (None, 0))
+            if depth == 0 and fcntl is not None:
+                handle = open(lock_path, 'a')
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            _file_locks[lock_path] = (handle, depth + 1)
+            try:
+                yield
+            finally:
+                handle, depth = _file_locks[lock_path]
+                if depth > 1:
+                    _file_locks[lock_path] = (handle, depth - 1)
+                else:
+                    del _file_locks[lock_path]
+                    if handle is not None:
+                        fcntl.flock(handle, fcntl.LOCK_UN)
+                        handle.close()
+
+    def locked(self):
+        """Hold this file's write lock (re-entrant) across several operations"""
+        return self._exclusive()
+
+    def _committer(self) -> _GroupCommitter:
+        key = os.path.abspath(self.file_path)
+        with _committers_lock:
+            if key not in _committers:
+                _committers[key] = _GroupCommitter(self._write_journal_lines)
+            return _committers[key]
+
+    def append(self, collection: str, record: Dict[str, Any]):
+        """Append one record to its collection journal.
+
+        Returns once the record is on disk. Concurrent callers are group
+        committed, so a burst of submissions shares a single fsync.
+        """
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        self._committer().submit(collection, line)
+
+    def extend(self, collection: str, records: List[Dict[str, Any]]):
+        """Append many records with one journal write and one fsync"""
+        self._write_journal_lines([(collection, json.dumps(record, ensure_ascii=False) + '\n')
+                                   for record in records])
+
+    def _write_journal_lines(self, batch: List[Tuple[str, str]]):
+        """Durably append (collection, line) pairs, compacting when due"""
+        lines_by_collection: Dict[str, List[str]] = {}
+        for collection, line in batch:
+            lines_by_collection.setdefault(collection, []).append(line)
+
+        with self._exclusive():
+            # Refresh first: another process may have compacted into a new
+            # generation since we last looked.
+            cached = self._cached_document()
+            for collection, lines in lines_by_collection.items():
+                path = self.journal_path(collection, cached.generation)
+                created = not os.path.exists(path)
+                with open(path, 'ab') as f:
+                    # A writer that died mid-line leaves a partial record;
+                    # terminate it so ours doesn't get glued onto it.
+                    if f.tell() > 0:
+                        with open(path, 'rb') as tail:
+                            tail.seek(-1, os.SEEK_END)
+                            if tail.read(1) != b'\n':
+                                f.write(b'\n')
+                    payload = ''.join(lines).encode('utf-8')
+                    f.write(payload)
+                    count_bytes('json_store.write', len(payload))
+                    f.flush()
+                    os.fsync(f.fileno())
+                if created:
+                    _fsync_directory(os.path.dirname(os.path.abspath(path)))
+            with _cache_lock:
+                self._replay_journals(cached)
+                compact = cached.journal_entries >= COMPACT_AFTER
+                if compact:
+                    data = _copy_document(cached.document())
+
+            if compact:
+                # Same records, new snapshot: the indexes are still valid
+                self.save(data, cached.indexes)
+
+    def add_user_if_absent(self, user: Dict[str, Any]) -> bool:
+        """Append a user unless the username is taken; check and append are atomic"""
+        with self._exclusive():
+            if self.get_user(user['username']) is not None:
+                return False
+            self._write_journal_lines([('users', json.dumps(user, ensure_ascii=False) + '\n')])
+        return True
+
+    def get_user(self, username: str) -> Optional[Dict[str, Any]]:
+        with _cache_lock:
+            return self._cached_document().index('users', UserIndex.from_data).get(username)
+
+    def update_users(self, users: List[Dict[str, Any]]):
+        """Replace the stored records of these users (matched by username)"""
+        replacements = {user['username']: user for user in users}
+
+        def mutate(data):
+            data['users'] = [replacements.get(u.get('username'), u) for u in data.get('users', [])]
+        self.update(mutate)
+
+    def update(self, mutate: Callable[[Dict[str, Any]], None]):
+        """Apply `mutate` to a fresh copy of the data and save it, holding the
+        lock so no concurrent append is lost in between"""
+        with self._exclusive():
+            data = _copy_document(self.load())
+            mutate(data)
+            self.save(data)
+
+    def create(self, data: Dict[str, Any]) -> bool:
+        """Save `data` unless the file already exists; check and save are atomic"""
+        with self._exclusive():
+            if self.exists():
+                return False
+            self.save(data)
+        return True
+
+    def compact(self):
+        """Fold pending journal records into a new snapshot now"""
+        with self._exclusive():
+            with _cache_lock:
+                cached = self._cached_document()
+                if not cached.journal_entries:
+                    return
+                data = _copy_document(cached.document())
+            self.save(data, cached.indexes)
+
+    def save(self, data: Dict[str, Any], indexes: Optional[Dict[str, Any]] = None):
+        """Save data to JSON file, folding any journals into a new snapshot.
+
+        `indexes` may carry indexes already built over exactly this data, so
+        they survive a compaction instead of being rebuilt.
+        """
+        with self._exclusive():
+            generation = 0
+            if os.path.exists(self.file_path):
+                generation = self._cached_document().generation + 1
+
+            snapshot = dict(data)
+            snapshot[GENERATION_KEY] = generation
+            _write_atomically(self.file_path, snapshot, indent=2)
+            signature = _file_signature(self.file_path)
+
+            # Persist the aggregates that belong to this snapshot
+            indexes = dict(indexes or {})
+            if 'reviews' in self.collections:
+                if 'aggregates' not in indexes:
+                    indexes['aggregates'] = DailyAggregates.from_data(data)
+                self.write_aggregates(generation, indexes['aggregates'], signature)
+
+            # Our own write is already parsed; refresh the cache instead of
+            # forcing the next reader to parse the file again.
+            cached = _CachedDocument(signature, generation, _copy_document(data),
+                                     required=self.required)
+            cached.indexes = indexes
+            with _cache_lock:
+                _data_cache[os.path.abspath(self.file_path)] = cached
+
+            self._remove_stale_journals(generation)
+
+    def write_aggregates(self, generation: int, aggregates: DailyAggregates,
+                         signature: Optional[Tuple[int, int, int]] = None):
+        """Persist `aggregates` as those of the current snapshot file"""
+        _write_atomically(self.aggregates_path, {
+            'generation': generation,
+            'snapshot': list(signature or _file_signature(self.file_path)),
+            **aggregates.to_dict(),
+        })
+
+    def _remove_stale_journals(self, generation: int):
+        """Delete journals that belong to snapshots older than `generation`"""
+        base = os.path.splitext(self.file_path)[0]
+        for path in glob.glob(glob.escape(base) + '.*.*.jsonl'):
+            try:
+                journal_generation = int(path.rsplit('.', 2)[-2])
+            except ValueError:
+                continue
+            if journal_generation < generation:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error removing journal {path}: {e}")
+
+    def version(self, collection: Optional[str] = None) -> Tuple:
+        """Token that changes whenever the data (or just `collection`) changes"""
+        with _cache_lock:
+            cached = self._cached_document()
+            if collection is not None:
+                return (cached.signature, cached.journal_offsets.get(collection, 0))
+            return (cached.signature, tuple(sorted(cached.journal_offsets.items())))
+
+    # Queries. The JSON store answers them from the cached document.
+
+    def records(self, collection: str) -> List[Dict]:
+        with _cache_lock:
+            return list(self._cached_document().collection(collection))
+
+    def review_columns(self) -> ReviewColumns:
+        """The shared column-stored reviews (read-only; appended to in place)"""
+        with _cache_lock:
+            return self._cached_document().collection('reviews')
+
+    def recent(self, collection: str, limit: int) -> List[Dict]:
+        with _cache_lock:
+            return self._cached_document().recent(collection, limit)
+
+    def iter_reviews(self, since_day: Optional[str] = None, until_day: Optional[str] = None,
+                     user: Optional[str] = None, chunk_size: int = 5000) -> Iterator[List[Dict]]:
+        """Reviews in insertion order, filtered, in chunks of up to `chunk_size`.
+
+        Iterates the shared cached list in place, so no copy of the full
+        history is made.
+        """
+        with _cache_lock:
+            reviews = self._cached_document().collection('reviews')
+            end = len(reviews)  # Ignore reviews appended while we iterate
+        until = None if until_day is None else _next_day(until_day)
+        for start in range(0, end, chunk_size):
+            chunk = [review for review in reviews[start:min(start + chunk_size, end)]
+                     if (user is None or review.get('user') == user)
+                     and (since_day is None or (review.get('timestamp') or '') >= since_day)
+                     and (until is None or (review.get('timestamp') or '') < until)]
+            if chunk:
+                yield chunk
+
+    def count(self, collection: str, category: Any = None) -> int:
+        with _cache_lock:
+            if category is None:
+                return len(self._cached_document().collection(collection))
+            return len(self._listing().positions(collection, category))
+
+    def _listing(self) -> ListingIndex:
+        return self._cached_document().index('listing', ListingIndex.from_data)
+
+    def page(self, collection: str, offset: int = 0, limit: Optional[int] = None,
+             category: Any = None) -> List[Dict]:
+        """Records in insertion order, optionally only one category, sliced"""
+        end = None if limit is None else offset + limit
+        with _cache_lock:
+            cached = self._cached_document()
+            records = cached.collection(collection)
+            if category is None:
+                return records[offset:end]
+            positions = self._listing().positions(collection, category)
+            return [records[position] for position in positions[offset:end]]
+
+    def newest(self, collection: str, limit: Optional[int] = None,
+               before: Optional[Tuple[str, int]] = None) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """Up to `limit` news articles newest first, starting after the `before`
+        cursor, plus the cursor for the next page (None on the last page)"""
+        with _cache_lock:
+            records = self._cached_document().collection(collection)
+            keys = self._listing().newest_news(before, None if limit is None else limit + 1)
+            next_cursor = keys[limit - 1] if limit and len(keys) > limit else None
+            return [records[position] for _, position in keys[:limit]], next_cursor
+
+    def aggregates(self) -> DailyAggregates:
+        with _cache_lock:
+            cached = self._cached_document()
+            return cached.index('aggregates', lambda data: self._load_aggregates(cached))
+
+    def _load_aggregates(self, cached: _CachedDocument) -> DailyAggregates:
+        """Persisted aggregates for the snapshot plus the replayed journal
+        records, or a full rebuild if the sidecar is missing or stale"""
+        try:
+            with open(self.aggregates_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+                count_bytes('json_store.read', os.fstat(f.fileno()).st_size)
+            # Generations alone repeat (every journal-less file is 0), so the
+            # sidecar must also have been written for this very file
+            if (payload.get('generation') == cached.generation
+                    and payload.get('snapshot') == list(cached.signature)):
+                aggregates = DailyAggregates.from_dict(payload)
+                for review in cached.journal_records('reviews'):
+                    aggregates.add('reviews', review)
+                return aggregates
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Rebuilding review aggregates: {e}")
+        return DailyAggregates.from_data(_Collections(cached))
+
+    def has_review_on(self, user_id: str, day: str) -> bool:
+        return self.aggregates().contains(day, user_id)
+
+    def rating_averages(self, since_day: str) -> Dict[str, float]:
+        return self.aggregates().averages(since_day)
+
+    def review_stats(self, since_day: str) -> Dict[str, Any]:
+        return self.aggregates().stats(since_day)
@@ -0,0 +1,182 @@
+"""Lazy reader for data files written by json.dump(..., indent=2)
+
+In that layout every top-level key starts a line with exactly two spaces of
+indentation, and every element of a top-level array starts a line with
+exactly four. JSON strings cannot contain raw newlines, so both markers
+can be located with plain byte searches. One pass over the file in
+fixed-size chunks records the byte span of each top-level value; a
+collection is parsed only when it is first asked for, and the last N
+records of an array are parsed straight from the end of its span.
+"""
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.instrumentation import count_bytes
+
+KEY_MARKER = b'\n  "'
+RECORD_MARKER = b'\n    {'
+CHUNK_SIZE = 1024 * 1024
+
+
+class LazyDocument:
+    """Byte spans of the top-level values of one snapshot file.
+
+    Keeps the file descriptor open, so spans stay valid even after the file
+    is atomically replaced (POSIX only: Windows won't replace an open file).
+    """
+
+    def __init__(self, fd: int, spans: Dict[str, Tuple[int, int]]):
+        self.fd = fd
+        self.spans = spans
+
+    @classmethod
+    def open(cls, path: str) -> Optional['LazyDocument']:
+        """Index `path`, or return None if it isn't in the indent=2 layout"""
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        try:
+            spans = _scan_spans(fd)
+        except BaseException:
+            os.close(fd)
+            raise
+        if spans is None:
+            os.close(fd)
+            return None
+        return cls(fd, spans)
+
+    def __del__(self):
+        try:
+            os.close(self.fd)
+        except (OSError, AttributeError, TypeError):
+            pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.spans
+
+    def keys(self) -> List[str]:
+        return list(self.spans)
+
+    def _read(self, start: int, end: int) -> bytes:
+        data = os.pread(self.fd, end - start, start)
+        count_bytes('json_store.read', len(data))
+        return data
+
+    def load(self, key: str) -> Any:
+        start, end = self.spans[key]
+        return json.loads(self._read(start, end))
+
+    def tail(self, key: str, limit: int) -> List[Any]:
+        """The last `limit` elements of a top-level array of objects"""
+        start, end = self.spans[key]
+        if limit <= 0:
+            return []
+        # The value looks like "[\n    {...},\n    {...}\n  ]"; walk back from
+        # the closing bracket to the start of the limit-th last record.
+        closing = end - 1
+        first = _rfind_nth(self, RECORD_MARKER, start, closing, limit)
+        if first is None:
+            first = start + 1
+        body = self._read(first, closing).strip().rstrip(b',')
+        if not body:
+            return []
+        return json.loads(b'[' + body + b']')
+
+    def iter_records(self, key: str) -> Iterator[Any]:
+        """Elements of a top-level array, parsed a window at a time so the
+        whole array never has to be held as text and objects at once"""
+        start, end = self.spans[key]
+        if self._read(start, start + 1) != b'[':
+            value = self.load(key)
+            if not isinstance(value, list):
+                raise ValueError(f"{key!r} is not an array")
+            yield from value
+            return
+
+        closing = end - 1
+        position = start + 1
+        window = CHUNK_SIZE
+        while position < closing:
+            buffer = self._read(position, min(closing, position + window))
+            if position + len(buffer) < closing:
+                # Cut before the last record starting in the window; if none
+                # does, the current record is bigger than the window
+                cut = buffer.rfind(RECORD_MARKER)
+                if cut <= 0:
+                    window *= 2
+                    continue
+                buffer = buffer[:cut]
+            body = buffer.strip().rstrip(b',')
+            if body:
+                yield from json.loads(b'[' + body + b']')
+            position += len(buffer)
+
+
+def _scan_spans(fd: int) -> Optional[Dict[str, Tuple[int, int]]]:
+    """Byte span of each top-level value, found by one chunked pass over the file"""
+    if os.pread(fd, len(KEY_MARKER) + 1, 0) != b'{' + KEY_MARKER:
+        return None
+
+    markers = []
+    offset = 0
+    carry = b''
+    while True:
+        chunk = os.pread(fd, CHUNK_SIZE, offset)
+        count_bytes('json_store.read', len(chunk))
+        if not chunk:
+            break
+        buffer = carry + chunk
+        base = offset - len(carry)
+        position = buffer.find(KEY_MARKER)
+        while position != -1:
+            markers.append(base + position)
+            position = buffer.find(KEY_MARKER, position + 1)
+        # Keep a marker split across chunks findable, without finding it twice
+        carry = buffer[-(len(KEY_MARKER) - 1):]
+        offset += len(chunk)
+    size = offset
+
+    # The last value ends at the newline before the closing brace
+    ending = os.pread(fd, 64, max(0, size - 64))
+    if not ending.rstrip().endswith(b'\n}'):
+        return None
+    document_end = size - (len(ending) - len(ending.rstrip())) - 2
+
+    spans = {}
+    bounds = markers + [document_end]
+    for marker, next_marker in zip(markers, bounds[1:]):
+        line = os.pread(fd, 1024, marker + 3)
+        separator = line.find(b'": ')
+        if separator == -1:
+            return None
+        key = json.loads(line[:separator + 1])
+        start = marker + 3 + separator + 3
+        end = next_marker
+        # Drop the "," that separates this value from the next key
+        if next_marker != document_end:
+            end -= 1
+        spans[key] = (start, end)
+    return spans
+
+
+def _rfind_nth(document: LazyDocument, marker: bytes, start: int, end: int, n: int,
+               chunk_size: int = 1024 * 1024) -> Optional[int]:
+    """Offset (just past the newline) of the n-th last `marker` in [start, end)"""
+    found = 0
+    window_end = end
+    while window_end > start:
+        window_start = max(start, window_end - chunk_size)
+        # Overlap so a marker straddling two windows is still seen once
+        buffer = document._read(window_start, min(end, window_end + len(marker) - 1))
+        position = len(buffer)
+        limit = window_end - window_start
+        while True:
+            position = buffer.rfind(marker, 0, position)
+            if position == -1:
+                break
+            if position >= limit:
+                continue
+            found += 1
+            if found == n:
+                return window_start + position + 1
+        window_end = window_start
+    return None
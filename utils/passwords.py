@@ -0,0 +1,106 @@
+"""Salted password hashing for the users collection
+
+Passwords are stored as ``pbkdf2_sha256$<iterations>$<salt>$<hash>``.
+The iteration count can be tuned with KHOLLPOLL_PBKDF2_ITERATIONS, and
+hashes made with a different count are upgraded on the next login.
+Entries without that prefix are legacy plaintext passwords; they still
+verify, and are hashed on the user's next login. To hash them all at once
+(about 0.1 s per user at the default cost), run:
+
+    python -m utils.passwords --data data/reviews.json
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+ALGORITHM = 'pbkdf2_sha256'
+ITERATIONS = int(os.environ.get('KHOLLPOLL_PBKDF2_ITERATIONS', 600_000))
+SALT_BYTES = 16
+
+# Successful verifications remembered so repeated logins skip the hash cost
+VERIFY_CACHE_SIZE = 256
+
+# Cache keys use a per-process secret, so the cache never holds anything
+# that could be tested against offline
+_cache_secret = os.urandom(32)
+_verified: 'OrderedDict[Tuple[str, bytes], bool]' = OrderedDict()
+_verified_lock = threading.Lock()
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode('ascii')
+
+
+def _derive(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
+
+
+def hash_password(password: str, iterations: Optional[int] = None) -> str:
+    iterations = iterations or ITERATIONS
+    salt = os.urandom(SALT_BYTES)
+    return f"{ALGORITHM}${iterations}${_b64(salt)}${_b64(_derive(password, salt, iterations))}"
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(ALGORITHM + '$')
+
+
+def needs_rehash(stored: str) -> bool:
+    """True for plaintext entries and hashes made with another iteration count"""
+    if not is_hashed(stored):
+        return True
+    try:
+        return int(stored.split('$')[1]) != ITERATIONS
+    except (IndexError, ValueError):
+        return True
+
+
+def _check(password: str, stored: str) -> bool:
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
+    try:
+        _, iterations, salt, expected = stored.split('$')
+        derived = _derive(password, base64.b64decode(salt), int(iterations))
+    except (ValueError, TypeError) as e:
+        print(f"Error reading password hash: {e}")
+        return False
+    return hmac.compare_digest(_b64(derived), expected)
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """Check `password` against a stored hash (or legacy plaintext entry)"""
+    key = (stored, hmac.new(_cache_secret, password.encode('utf-8'), hashlib.sha256).digest())
+    with _verified_lock:
+        if key in _verified:
+            _verified.move_to_end(key)
+            return True
+
+    if not _check(password, stored):
+        return False
+
+    with _verified_lock:
+        _verified[key] = True
+        while len(_verified) > VERIFY_CACHE_SIZE:
+            _verified.popitem(last=False)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash the plaintext passwords left in a data file.")
+    parser.add_argument('--data', default="data/reviews.json", help="data file to migrate")
+    args = parser.parse_args(argv)
+
+    from utils.data_manager import SimpleDataManager
+    hashed = SimpleDataManager(args.data).migrate_passwords()
+    print(f"Hashed {hashed} plaintext password(s) in {args.data}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
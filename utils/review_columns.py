@@ -0,0 +1,237 @@
+"""Compact in-memory storage for the review collection
+
+A review dict with its key strings, ISO timestamp string and per-record
+user string costs several hundred bytes; at a million reviews that
+dominated the process. ReviewColumns keeps the same reviews as parallel
+typed arrays:
+
+    user       interned id (uint32) into one list of user names
+    meals      int8 per meal, -1 when the rating is missing or None
+    overall    float64
+    timestamp  int64 microseconds since 1970-01-01 (naive, like the stored
+               strings), parsed once on ingest
+    comments   shared string objects (identical comments stored once)
+
+Indexing or iterating yields plain dicts rebuilt from the columns, with the
+original key order, so callers keep the dict-based API. A review whose
+values can't be reproduced exactly from the columns (extra keys, half-star
+ratings, unusual timestamp formats, ...) is also kept verbatim in
+`overflow` and returned from there; its columns hold a best-effort copy.
+"""
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+FIELDS = ('user', *MEALS, 'overall', 'comments', 'timestamp')
+
+MISSING_RATING = -1
+MISSING_USER = 0xFFFFFFFF
+MISSING_TIMESTAMP = -2 ** 63  # Also numpy's NaT, so the array views as datetime64 directly
+EPOCH = datetime(1970, 1, 1)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+def to_epoch_us(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_epoch_us(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=value)
+
+
+class ReviewColumns(Sequence):
+    """List-like sequence of reviews stored as parallel arrays"""
+
+    def __init__(self):
+        self.user_ids = array('I')
+        self.user_names: List[Any] = []
+        self.meals = {meal: array('b') for meal in MEALS}
+        self.overall = array('d')
+        self.timestamps = array('q')
+        self.comments: List[Optional[str]] = []
+        self.layouts = array('B')
+        self.overflow: Dict[int, Dict[str, Any]] = {}
+        self._user_index: Dict[Any, int] = {}
+        self._strings: Dict[str, str] = {}
+        self._layout_keys: List[Tuple[str, ...]] = []
+        self._layout_index: Dict[Tuple[str, ...], int] = {}
+        self._days: Dict[int, str] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'ReviewColumns':
+        columns = cls()
+        columns.extend(records)
+        return columns
+
+    @classmethod
+    def concat(cls, parts: Iterable['ReviewColumns']) -> 'ReviewColumns':
+        """One sequence holding the reviews of every part, in order"""
+        columns = cls()
+        for part in parts:
+            columns.extend_columns(part)
+        return columns
+
+    def extend_columns(self, other: 'ReviewColumns'):
+        """Append another ReviewColumns without going through dicts"""
+        count = len(other)
+        offset = len(self)
+        users = [self._user_id(name) for name in other.user_names]
+        self.user_ids.extend(array('I', (MISSING_USER if user_id == MISSING_USER else users[user_id]
+                                         for user_id in other.user_ids[:count])))
+        for meal in MEALS:
+            self.meals[meal].extend(other.meals[meal][:count])
+        self.overall.extend(other.overall[:count])
+        self.timestamps.extend(other.timestamps[:count])
+        self.comments.extend(other.comments[:count])
+
+        layouts = [self._layout(keys) if len(self._layout_keys) < 255 or keys in self._layout_index else 255
+                   for keys in other._layout_keys]
+        for row, layout in enumerate(other.layouts[:count]):
+            layout = 255 if layout == 255 else layouts[layout]
+            self.layouts.append(layout)
+            if layout == 255:
+                self.overflow[offset + row] = other._review(row)
+
+    def copy(self) -> 'ReviewColumns':
+        """Independent copy (the arrays are copied, the interned values shared)"""
+        other = ReviewColumns()
+        other.user_ids = array('I', self.user_ids)
+        other.user_names = list(self.user_names)
+        other.meals = {meal: array('b', values) for meal, values in self.meals.items()}
+        other.overall = array('d', self.overall)
+        other.timestamps = array('q', self.timestamps)
+        other.comments = list(self.comments)
+        other.layouts = array('B', self.layouts)
+        other.overflow = dict(self.overflow)
+        other._user_index = dict(self._user_index)
+        other._strings = dict(self._strings)
+        other._layout_keys = list(self._layout_keys)
+        other._layout_index = dict(self._layout_index)
+        other._days = dict(self._days)
+        return other
+
+    # Writing
+
+    def _user_id(self, user: Any) -> int:
+        if not isinstance(user, str):
+            return MISSING_USER
+        user_id = self._user_index.get(user)
+        if user_id is None:
+            user_id = self._user_index[user] = len(self.user_names)
+            self.user_names.append(user)
+        return user_id
+
+    def _layout(self, keys: Tuple[str, ...]) -> int:
+        layout = self._layout_index.get(keys)
+        if layout is None:
+            layout = self._layout_index[keys] = len(self._layout_keys)
+            self._layout_keys.append(keys)
+        return layout
+
+    def append(self, review: Dict[str, Any]):
+        exact = True
+        keys = tuple(review)
+        if not all(key in FIELDS for key in keys):
+            exact = False
+
+        user = review.get('user')
+        self.user_ids.append(self._user_id(user))
+        exact = exact and (user is None or isinstance(user, str))
+
+        for meal in MEALS:
+            rating = review.get(meal)
+            if type(rating) is int and 0 <= rating <= 127:
+                self.meals[meal].append(rating)
+            else:
+                self.meals[meal].append(MISSING_RATING)
+                exact = exact and rating is None
+
+        overall = review.get('overall')
+        if type(overall) is float and overall == overall:
+            self.overall.append(overall)
+        else:
+            self.overall.append(float(overall) if isinstance(overall, (int, float)) else float('nan'))
+            exact = exact and 'overall' not in review
+
+        comments = review.get('comments')
+        if isinstance(comments, str):
+            comments = self._strings.setdefault(comments, comments)
+        else:
+            exact = exact and comments is None
+        self.comments.append(comments)
+
+        timestamp = review.get('timestamp')
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+            # Same rule as indexes.review_day: only canonical dates are dated
+            if timestamp[:10] != parsed.date().isoformat():
+                raise ValueError(timestamp)
+            self.timestamps.append(to_epoch_us(parsed.replace(tzinfo=None)))
+            exact = exact and parsed.tzinfo is None and parsed.isoformat() == timestamp
+        except (TypeError, ValueError):
+            self.timestamps.append(MISSING_TIMESTAMP)
+            exact = exact and 'timestamp' not in review
+
+        known = keys in self._layout_index or len(self._layout_keys) < 255
+        self.layouts.append(self._layout(keys) if exact and known else 255)
+        if self.layouts[-1] == 255:
+            self.overflow[len(self.layouts) - 1] = review
+
+    def extend(self, reviews: Iterable[Dict[str, Any]]):
+        for review in reviews:
+            self.append(review)
+
+    # Reading
+
+    def __len__(self) -> int:
+        return len(self.layouts)
+
+    def _review(self, row: int) -> Dict[str, Any]:
+        layout = self.layouts[row]
+        if layout == 255:
+            return self.overflow[row]
+        review = {}
+        for key in self._layout_keys[layout]:
+            if key == 'user':
+                user_id = self.user_ids[row]
+                review[key] = None if user_id == MISSING_USER else self.user_names[user_id]
+            elif key == 'overall':
+                review[key] = self.overall[row]
+            elif key == 'comments':
+                review[key] = self.comments[row]
+            elif key == 'timestamp':
+                review[key] = from_epoch_us(self.timestamps[row]).isoformat()
+            else:
+                rating = self.meals[key][row]
+                review[key] = None if rating == MISSING_RATING else rating
+        return review
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._review(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('review index out of range')
+        return self._review(index)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self._review(row)
+
+    def day(self, row: int) -> Optional[str]:
+        """YYYY-MM-DD of a review's timestamp without re-parsing it"""
+        timestamp = self.timestamps[row]
+        if timestamp == MISSING_TIMESTAMP:
+            return None
+        day_number = timestamp // MICROSECONDS_PER_DAY
+        day = self._days.get(day_number)
+        if day is None:
+            day = self._days[day_number] = (EPOCH + timedelta(days=day_number)).date().isoformat()
+        return day
+
+    def user(self, row: int) -> Any:
+        user_id = self.user_ids[row]
+        return None if user_id == MISSING_USER else self.user_names[user_id]
@@ -0,0 +1,154 @@
+"""Shared columnar view of the reviews for charts and dashboard metrics
+
+Turning the reviews into a DataFrame on every rerun (and again inside each
+chart) dominated the mess dashboard. Here it is built once per data version,
+straight from the store's review arrays, with compact dtypes and shared by
+every caller:
+
+    user       category
+    breakfast  Int8   (nullable, so missing ratings stay out of means)
+    lunch      Int8
+    snacks     Int8
+    dinner     Int8
+    overall    float32
+    timestamp  datetime64[ns]
+
+The cached frame is shared across sessions; treat it as read-only.
+"""
+import threading
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.review_columns import MISSING_RATING, MISSING_TIMESTAMP, MISSING_USER, ReviewColumns
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+COLUMNS = ['user'] + MEALS + ['overall', 'timestamp']
+
+_frames: Dict[str, Tuple[Any, pd.DataFrame]] = {}
+_frames_lock = threading.Lock()
+
+
+def _ratings(values: List[Any]):
+    """Meal ratings as nullable int8, or float32 if someone stored half stars"""
+    try:
+        return pd.array(values, dtype='Int8')
+    except (TypeError, ValueError):
+        return pd.array(values, dtype='Float32')
+
+
+def to_frame(reviews: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build the columnar frame from review dicts"""
+    columns = {
+        'user': pd.Categorical([r.get('user') for r in reviews]),
+    }
+    for meal in MEALS:
+        columns[meal] = _ratings([r.get(meal) for r in reviews])
+    columns['overall'] = np.array(
+        [np.nan if r.get('overall') is None else r['overall'] for r in reviews], dtype=np.float32)
+    columns['timestamp'] = pd.to_datetime(
+        pd.Series([r.get('timestamp') for r in reviews], dtype=object),
+        format='ISO8601', errors='coerce')
+    return pd.DataFrame(columns, columns=COLUMNS)
+
+
+def _categories(columns: ReviewColumns, user_ids: np.ndarray) -> pd.Categorical:
+    """Interned user ids as a Categorical with sorted categories (like
+    pd.Categorical over the user strings would have)"""
+    names = np.array(columns.user_names[:], dtype=object)
+    missing = user_ids == MISSING_USER
+    if not len(names):
+        return pd.Categorical.from_codes(np.full(len(user_ids), -1), categories=[])
+    order = np.argsort(names, kind='stable')
+    rank = np.empty(len(names), dtype=np.int64)
+    rank[order] = np.arange(len(names))
+    codes = np.where(missing, -1, rank[np.where(missing, 0, user_ids)])
+    return pd.Categorical.from_codes(codes, categories=names[order])
+
+
+def from_columns(columns: ReviewColumns) -> pd.DataFrame:
+    """Build the columnar frame from the store's review arrays without
+    going through per-review dicts"""
+    n = len(columns)
+    # Slicing copies the arrays, so concurrent appends can't resize them
+    # while numpy is looking at their buffers
+    frame_columns = {
+        'user': _categories(columns, np.array(columns.user_ids[:n], dtype=np.int64)),
+    }
+    overflow = sorted(row for row in columns.overflow if row < n)
+    for meal in MEALS:
+        ratings = np.array(columns.meals[meal][:n], dtype=np.int8)
+        values = [columns.overflow[row].get(meal) for row in overflow]
+        if all(value is None or type(value) is int and -128 <= value <= 127 for value in values):
+            mask = ratings == MISSING_RATING
+            for row, value in zip(overflow, values):
+                mask[row] = value is None
+                ratings[row] = value or 0
+            frame_columns[meal] = pd.arrays.IntegerArray(ratings, mask)
+        else:
+            # Half-star ratings somewhere: fall back to the general path
+            ratings = [None if rating == MISSING_RATING else int(rating) for rating in ratings]
+            for row, value in zip(overflow, values):
+                ratings[row] = value
+            frame_columns[meal] = _ratings(ratings)
+
+    overall = np.array(columns.overall[:n], dtype=np.float32)
+    for row in overflow:
+        value = columns.overflow[row].get('overall')
+        overall[row] = np.nan if value is None else value
+    frame_columns['overall'] = overall
+
+    # Microseconds since the epoch, MISSING_TIMESTAMP being NaT; values
+    # outside the datetime64[ns] range become NaT like unparsable strings
+    timestamps = np.array(columns.timestamps[:n], dtype=np.int64)
+    in_range = (timestamps > -(2 ** 63) // 1000) & (timestamps < (2 ** 63 - 1) // 1000)
+    timestamps = np.where(in_range, timestamps, MISSING_TIMESTAMP)
+    frame_columns['timestamp'] = timestamps.view('datetime64[us]').astype('datetime64[ns]')
+    return pd.DataFrame(frame_columns, columns=COLUMNS)
+
+
+def as_frame(reviews) -> pd.DataFrame:
+    """Accept a review frame, review arrays or a plain list of review dicts"""
+    if isinstance(reviews, pd.DataFrame):
+        return reviews
+    if isinstance(reviews, ReviewColumns):
+        return from_columns(reviews)
+    return to_frame(reviews or [])
+
+
+def daily_totals(frame: pd.DataFrame) -> pd.DataFrame:
+    """Per-day sum and count of overall ratings, indexed by day.
+
+    Days without reviews are included with a zero count, so the result can be
+    resampled to coarser periods by summing.
+    """
+    dated = frame.dropna(subset=['timestamp'])
+    return (dated.set_index('timestamp')['overall'].astype('float64')
+            .resample('D').agg(['sum', 'count']))
+
+
+def _cached(dm, name: str, build) -> pd.DataFrame:
+    """Memoize `build()` per store and reviews data version"""
+    version = dm.data_version('reviews')
+    key = f"{dm.store.file_path}:{name}"
+    with _frames_lock:
+        cached = _frames.get(key)
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+
+    frame = build()
+    if version is not None:
+        with _frames_lock:
+            _frames[key] = (version, frame)
+    return frame
+
+
+def get_review_frame(dm) -> pd.DataFrame:
+    """Columnar reviews for `dm`, rebuilt only when the reviews change"""
+    return _cached(dm, 'reviews', lambda: from_columns(dm.review_columns()))
+
+
+def get_daily_totals(dm) -> pd.DataFrame:
+    """daily_totals() of the shared review frame, rebuilt only when the reviews change"""
+    return _cached(dm, 'daily', lambda: daily_totals(get_review_frame(dm)))
@@ -0,0 +1,115 @@
+"""Inverted-index full-text search for events and news
+
+Each collection gets one index per process. It is built the first time it
+is searched and then only fed the records appended since, so a keystroke
+search costs a few dictionary lookups instead of lowercasing every field
+of every item.
+"""
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Searchable fields per collection, with their ranking weight
+SEARCH_FIELDS = {
+    'events': {'title': 3.0, 'organizer': 2.0, 'description': 1.0},
+    'news': {'title': 3.0, 'content': 1.0},
+}
+
+# A term that only prefixes a word scores this fraction of an exact match
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+class SearchIndex:
+    """Tokenized inverted index with prefix matching and weighted ranking"""
+
+    def __init__(self, fields: Dict[str, float]):
+        self.fields = fields
+        self.docs: List[Dict[str, Any]] = []
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.vocabulary: List[str] = []  # sorted, for prefix lookups
+
+    def add(self, doc: Dict[str, Any]):
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        for field, weight in self.fields.items():
+            for token in tokenize(str(doc.get(field) or '')):
+                postings = self.postings.get(token)
+                if postings is None:
+                    postings = self.postings[token] = {}
+                    insort(self.vocabulary, token)
+                postings[doc_id] = postings.get(doc_id, 0) + weight
+
+    def sync(self, docs: List[Dict[str, Any]]):
+        """Catch up with `docs`: index only the new tail if the collection was
+        appended to, otherwise rebuild from scratch"""
+        indexed = len(self.docs)
+        if len(docs) < indexed or (indexed and docs[indexed - 1] != self.docs[-1]):
+            self.__init__(self.fields)
+            indexed = 0
+        for doc in docs[indexed:]:
+            self.add(doc)
+
+    def _matches(self, term: str) -> Dict[int, float]:
+        """Scores of documents containing a word that starts with `term`"""
+        scores: Dict[int, float] = {}
+        position = bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(term):
+            token = self.vocabulary[position]
+            factor = 1.0 if token == term else PREFIX_WEIGHT
+            for doc_id, weight in self.postings[token].items():
+                scores[doc_id] = max(scores.get(doc_id, 0), weight * factor)
+            position += 1
+        return scores
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """Documents matching every term of `query`, best match first.
+
+        Every term matches as a word prefix, so results show up while the
+        user is still typing. Ties keep insertion order. A blank query
+        returns every document.
+        """
+        terms = tokenize(query)
+        if not terms:
+            # A blank query lists everything; one of only punctuation
+            # ("!!!", "--") matches nothing, as the old substring filter did
+            return [] if query.strip() else list(self.docs)
+
+        scores: Optional[Dict[int, float]] = None
+        for term in terms:
+            matches = self._matches(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {doc_id: score + matches[doc_id]
+                          for doc_id, score in scores.items() if doc_id in matches}
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        return [self.docs[doc_id] for doc_id in ranked]
+
+
+# Process-wide indexes: (store path, collection) -> (data version, index)
+_indexes: Dict[Tuple[str, str], Tuple[Any, SearchIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def search(dm, collection: str, query: str) -> List[Dict[str, Any]]:
+    """Search one collection of `dm`, keeping its index in sync with the data"""
+    key = (dm.store.file_path, collection)
+    version = dm.data_version(collection)
+    with _indexes_lock:
+        cached_version, index = _indexes.get(key, (None, None))
+        if index is None:
+            index = SearchIndex(SEARCH_FIELDS[collection])
+        if version is None or version != cached_version:
+            index.sync(dm.store.records(collection))
+            _indexes[key] = (version, index)
+        return index.search(query)
@@ -0,0 +1,408 @@
+"""One data file per collection, with reviews sharded by month
+
+    data/reviews/events.json
+    data/reviews/news.json
+    data/reviews/users.json
+    data/reviews/reviews-2024-05.json    reviews timestamped in May 2024
+    data/reviews/reviews-undated.json    reviews without a usable timestamp
+    data/reviews/reviews.order           the shard of every review, in insertion order
+    data/reviews/.complete               written once a full save has finished
+
+Every file is a JsonStore of its own (snapshot plus journals, parsed lazily
+and cached per process), so adding a news article only touches news.json
+and a review only its month's shard. "Last N days" queries read the
+aggregates of the shards covering those days; all-time stats combine each
+shard's persisted aggregates without parsing any reviews.
+
+Months before the previous one are closed: when a new month's shard is
+created, older shards get their journals folded into the snapshot one last
+time, after which their files no longer change and their cached parse and
+aggregates stay valid for the life of the process. (A back-dated import
+still appends to the right month; that shard is simply read again.)
+
+Reviews come back in insertion order, like the other backends: each
+append also adds its shard's name to reviews.order, and readers interleave
+the shards by it. A line lost in a crash (the review was written, the
+line not) is repaired on the next read by putting that review last.
+"""
+import os
+import re
+import threading
+from collections import Counter
+from itertools import groupby
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.indexes import FIELDS, averages_from_sums, review_day
+from utils.json_store import JsonStore
+from utils.review_columns import ReviewColumns
+
+# Collections kept in a single file each; reviews are sharded
+COLLECTION_FILES = ('events', 'news', 'users')
+
+UNDATED = 'undated'
+SHARD_PATTERN = re.compile(r'^reviews-(\d{4}-\d{2}|undated)\.json$')
+
+# Written after the last file of a save; until then the directory is a
+# partial (e.g. interrupted) migration and does not count as existing
+COMPLETE_MARKER = '.complete'
+
+# One fixed-width line per review naming its shard ("2024-05\n",
+# "undated\n"), so the newest N entries are the last N * 8 bytes
+ORDER_FILE = 'reviews.order'
+ORDER_WIDTH = 8
+
+# Parsed reviews.order per directory: (size, mtime_ns) -> order
+_orders: Dict[str, Tuple[Tuple[int, int], List[str]]] = {}
+_orders_lock = threading.Lock()
+
+
+def review_month(review: Dict[str, Any]) -> str:
+    """YYYY-MM shard a review belongs to"""
+    day = review_day(review)
+    return day[:7] if day else UNDATED
+
+
+def _previous_month(month: str) -> str:
+    year, number = int(month[:4]), int(month[5:7])
+    return f"{year - 1}-12" if number == 1 else f"{year}-{number - 1:02d}"
+
+
+def _interleave(order: List[str], by_month: Dict[str, List[Any]]) -> List[Any]:
+    """Items of `by_month` in `order`; anything left over goes last"""
+    positions = Counter()
+    items = []
+    for month in order:
+        records = by_month.get(month, ())
+        if positions[month] < len(records):
+            items.append(records[positions[month]])
+            positions[month] += 1
+    for month, records in by_month.items():
+        items.extend(records[positions[month]:])
+    return items
+
+
+class ShardedStore:
+    """Per-collection files plus monthly review shards in one directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        # Identifies the store in caches, like a JSON store's data file
+        self.file_path = directory
+        self._stores = {name: JsonStore(os.path.join(directory, f"{name}.json"), (name,))
+                        for name in COLLECTION_FILES}
+
+    def _shard(self, month: str) -> JsonStore:
+        return JsonStore(os.path.join(self.directory, f"reviews-{month}.json"), ('reviews',))
+
+    def months(self) -> List[str]:
+        """Months with a review shard: undated first, then oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        months = [match.group(1) for match in map(SHARD_PATTERN.match, names) if match]
+        return sorted(months, key=lambda month: (month != UNDATED, month))
+
+    def _shards(self, since_day: Optional[str] = None, until_day: Optional[str] = None) -> List[JsonStore]:
+        """Shards that can hold reviews in the (inclusive) day range"""
+        shards = []
+        for month in self.months():
+            if month == UNDATED:
+                if since_day is None and until_day is None:
+                    shards.append(self._shard(month))
+            elif (since_day is None or month >= since_day[:7]) and (until_day is None or month <= until_day[:7]):
+                shards.append(self._shard(month))
+        return shards
+
+    def _writable_shard(self, month: str) -> JsonStore:
+        """The shard for `month`, created (and older months closed) if new"""
+        shard = self._shard(month)
+        if not shard.exists() and shard.create({'reviews': []}) and month != UNDATED:
+            previous = _previous_month(month)
+            for older in self.months():
+                if older != UNDATED and older < previous:
+                    self._shard(older).compact()
+        return shard
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.directory, COMPLETE_MARKER))
+
+    def mark_complete(self):
+        path = os.path.join(self.directory, COMPLETE_MARKER)
+        if not os.path.exists(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('1\n')
+
+    # Insertion order
+
+    @property
+    def order_path(self) -> str:
+        return os.path.join(self.directory, ORDER_FILE)
+
+    @staticmethod
+    def _order_bytes(months: List[str]) -> bytes:
+        # str.join, not bytes.join: the latter holds a buffer per item
+        return ('\n'.join(months) + '\n').encode('ascii') if months else b''
+
+    def _log_order(self, months: List[str]):
+        """Record newly appended reviews' shards (after the reviews themselves)"""
+        payload = self._order_bytes(months)
+        fd = os.open(self.order_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        try:
+            os.write(fd, payload)  # One O_APPEND write: concurrent appends don't interleave
+        finally:
+            os.close(fd)
+
+    def _write_order(self, months: List[str]):
+        tmp_path = f"{self.order_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self._order_bytes(months))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.order_path)
+
+    def _logged_months(self, tail: Optional[int] = None) -> List[str]:
+        """Shard names from reviews.order (only the last `tail` if given)"""
+        try:
+            with open(self.order_path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                size = stat.st_size - stat.st_size % ORDER_WIDTH  # Skip a line still being written
+                if tail is not None:
+                    start = max(0, size - tail * ORDER_WIDTH)
+                    f.seek(start)
+                    return f.read(size - start).decode('ascii').split()
+                key = os.path.abspath(self.order_path)
+                with _orders_lock:
+                    cached = _orders.get(key)
+                    if cached is not None and cached[0] == (size, stat.st_mtime_ns):
+                        return cached[1]
+                # Kept per directory: decode line by line into one shared
+                # string per shard name rather than a string per line
+                raw = f.read(size)
+                names: Dict[bytes, str] = {}
+                months = []
+                for start in range(0, size, ORDER_WIDTH):
+                    line = raw[start:start + ORDER_WIDTH - 1]
+                    month = names.get(line)
+                    if month is None:
+                        month = names[line] = line.decode('ascii')
+                    months.append(month)
+                with _orders_lock:
+                    _orders[key] = ((size, stat.st_mtime_ns), months)
+                return months
+        except FileNotFoundError:
+            return []
+
+    def _order(self, tail: Optional[int] = None, counts: Optional[Dict[str, int]] = None) -> List[str]:
+        """Insertion order of the reviews (the last `tail` of them), with
+        reviews.order first repaired if it disagrees with the shards.
+
+        `counts` are the reviews per shard if the caller has them already;
+        otherwise they come from the shards' aggregates."""
+        if counts is None:
+            counts = {month: self._shard(month).aggregates().total_reviews for month in self.months()}
+        try:
+            logged = os.path.getsize(self.order_path) // ORDER_WIDTH
+        except FileNotFoundError:
+            logged = 0
+        if logged != sum(counts.values()):
+            # Drop lines whose review is not there, then put reviews
+            # without a line last (oldest shard first)
+            seen = Counter()
+            months = []
+            for month in self._logged_months():
+                if seen[month] < counts.get(month, 0):
+                    months.append(month)
+                    seen[month] += 1
+            for month, count in counts.items():
+                months.extend([month] * (count - seen[month]))
+            self._write_order(months)
+            return months if tail is None else months[-tail:] if tail else []
+        return self._logged_months(tail)
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the write lock of every file, always taken in the same order"""
+        with ExitStack() as stack:
+            stores = list(self._stores.values()) + [self._shard(month) for month in self.months()]
+            for store in sorted(stores, key=lambda store: store.file_path):
+                stack.enter_context(store.locked())
+            yield
+
+    # Whole-document access, for seeding and migrations
+
+    def load(self) -> Dict[str, Any]:
+        data = {'reviews': self.review_columns()}
+        for name, store in self._stores.items():
+            data[name] = store.records(name)
+        return data
+
+    def save(self, data: Dict[str, Any]):
+        """Replace all data, rewriting only the files whose records changed"""
+        os.makedirs(self.directory, exist_ok=True)
+        with self._exclusive():
+            for name, store in self._stores.items():
+                records = list(data.get(name, []))
+                if not store.exists() or store.records(name) != records:
+                    store.save({name: records})
+
+            by_month: Dict[str, List[Dict[str, Any]]] = {}
+            names: Dict[str, str] = {}
+            order = []
+            for review in data.get('reviews', []):
+                month = review_month(review)
+                month = names.setdefault(month, month)
+                by_month.setdefault(month, []).append(review)
+                order.append(month)  # One shared string per shard name
+            for month in set(self.months()) | set(by_month):
+                shard = self._shard(month)
+                records = by_month.get(month, [])
+                if not shard.exists() or shard.records('reviews') != records:
+                    shard.save({'reviews': records})
+            self._write_order(order)
+            self.mark_complete()
+
+    def update(self, mutate: Callable[[Dict[str, Any]], None]):
+        with self._exclusive():
+            data = self.load()
+            data['reviews'] = list(data['reviews'])
+            mutate(data)
+            self.save(data)
+
+    # Appends
+
+    def append(self, collection: str, record: Dict[str, Any]):
+        if collection == 'reviews':
+            month = review_month(record)
+            self._writable_shard(month).append('reviews', record)
+            self._log_order([month])
+        else:
+            self._stores[collection].append(collection, record)
+
+    def extend(self, collection: str, records: List[Dict[str, Any]]):
+        if collection != 'reviews':
+            self._stores[collection].extend(collection, records)
+            return
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for review in records:
+            by_month.setdefault(review_month(review), []).append(review)
+        for month in sorted(by_month):
+            self._writable_shard(month).extend('reviews', by_month[month])
+        self._log_order([review_month(review) for review in records])
+
+    def add_user_if_absent(self, user: Dict[str, Any]) -> bool:
+        return self._stores['users'].add_user_if_absent(user)
+
+    def get_user(self, username: str) -> Optional[Dict[str, Any]]:
+        return self._stores['users'].get_user(username)
+
+    def update_users(self, users: List[Dict[str, Any]]):
+        self._stores['users'].update_users(users)
+
+    def version(self, collection: Optional[str] = None) -> Tuple:
+        """Token that changes whenever the data (or just `collection`) changes"""
+        if collection == 'reviews':
+            return tuple((shard.file_path, shard.version('reviews')) for shard in self._shards())
+        if collection is not None:
+            return self._stores[collection].version(collection)
+        return (self.version('reviews'),) + tuple(self.version(name) for name in COLLECTION_FILES)
+
+    # Queries
+
+    def records(self, collection: str) -> List[Dict]:
+        if collection != 'reviews':
+            return self._stores[collection].records(collection)
+        by_month = {month: self._shard(month).records('reviews') for month in self.months()}
+        return _interleave(self._order(counts={month: len(records) for month, records in by_month.items()}),
+                           by_month)
+
+    def recent(self, collection: str, limit: int) -> List[Dict]:
+        if collection != 'reviews':
+            return self._stores[collection].recent(collection, limit)
+        # The newest lines of reviews.order say how many to take from each shard
+        order = self._order(limit)
+        newest = {month: self._shard(month).recent('reviews', count)
+                  for month, count in Counter(order).items()}
+        records: List[Dict] = []
+        for month in reversed(order):
+            if newest[month]:
+                records.append(newest[month].pop())
+        records.reverse()
+        return records
+
+    def review_columns(self) -> ReviewColumns:
+        parts = {month: self._shard(month).review_columns() for month in self.months()}
+        order = self._order(counts={month: len(part) for month, part in parts.items()})
+        runs = [month for month, _ in groupby(order)]
+        if len(runs) == len(set(runs)) and runs == [month for month in parts if month in runs]:
+            # Usual case: every shard's reviews came after the previous one's
+            return ReviewColumns.concat(parts.values())
+        return ReviewColumns.from_records(_interleave(order, parts))
+
+    def iter_reviews(self, since_day: Optional[str] = None, until_day: Optional[str] = None,
+                     user: Optional[str] = None, chunk_size: int = 5000) -> Iterator[List[Dict]]:
+        """Reviews month by month, reading only the shards in the day range
+        (unlike records(), in shard order rather than insertion order)"""
+        for shard in self._shards(since_day, until_day):
+            yield from shard.iter_reviews(since_day, until_day, user, chunk_size)
+
+    def count(self, collection: str, category: Any = None) -> int:
+        if collection == 'reviews':
+            return sum(shard.count('reviews') for shard in self._shards())
+        return self._stores[collection].count(collection, category)
+
+    def page(self, collection: str, offset: int = 0, limit: Optional[int] = None,
+             category: Any = None) -> List[Dict]:
+        return self._stores[collection].page(collection, offset, limit, category)
+
+    def newest(self, collection: str, limit: Optional[int] = None,
+               before: Optional[Tuple[str, int]] = None) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        return self._stores[collection].newest(collection, limit, before)
+
+    def has_review_on(self, user_id: str, day: str) -> bool:
+        shard = self._shard(day[:7])
+        return shard.exists() and shard.has_review_on(user_id, day)
+
+    def rating_averages(self, since_day: str) -> Dict[str, float]:
+        sums = [0] * (2 * len(FIELDS))
+        for shard in self._shards(since_day):
+            for i, value in enumerate(shard.aggregates().sums(since_day)):
+                sums[i] += value
+        return averages_from_sums(sums)
+
+    def review_stats(self, since_day: str) -> Dict[str, Any]:
+        """All-time totals from every shard's aggregates; recent counts only
+        from the shards on or after `since_day`"""
+        users = set()
+        total_reviews = 0
+        overall_total = 0.0
+        recent_reviews = 0
+        for month in self.months():
+            aggregates = self._shard(month).aggregates()
+            users |= aggregates.users
+            total_reviews += aggregates.total_reviews
+            overall_total += aggregates.overall_total
+            if month != UNDATED and month >= since_day[:7]:
+                recent_reviews += aggregates.recent_reviews(since_day)
+        return {
+            'total_reviews': total_reviews,
+            'active_users': len(users),
+            'recent_reviews': recent_reviews,
+            'avg_rating': overall_total / total_reviews if total_reviews else 0
+        }
+
+
+def migrate_json_to_shards(json_path: str, directory: str, force: bool = False) -> Dict[str, int]:
+    """Split a single JSON data file (snapshot plus journals) into shards.
+
+    Refuses to touch a directory that already holds a complete data set
+    unless `force` is set; a partial one (an interrupted migration) is
+    simply finished. The JSON file itself is left as it is. Returns the
+    number of records migrated per collection.
+    """
+    store = ShardedStore(directory)
+    if store.exists() and not force:
+        raise ValueError(f"{directory} already contains data; pass force=True to overwrite it")
+    store.save(JsonStore(json_path).load())
+    return {collection: store.count(collection) for collection in ('reviews',) + COLLECTION_FILES}
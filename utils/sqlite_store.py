@@ -0,0 +1,427 @@
+"""SQLite storage backend for SimpleDataManager
+
+Each collection is a table that keeps the original record as JSON in ``doc``
+next to the handful of columns we filter and sort on, so records round-trip
+unchanged while the hot queries (latest reviews, "rated today?", recent
+averages) are answered from indexes.
+
+Migrate an existing JSON data file once with:
+
+    python -m utils.sqlite_store data/reviews.json data/reviews.db
+"""
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple
+
+from utils.review_columns import ReviewColumns
+
+MEALS = ['breakfast', 'lunch', 'snacks', 'dinner']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    user TEXT,
+    timestamp TEXT,
+    breakfast REAL,
+    lunch REAL,
+    snacks REAL,
+    dinner REAL,
+    overall REAL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_user_timestamp ON reviews (user, timestamp);
+CREATE INDEX IF NOT EXISTS reviews_timestamp ON reviews (timestamp);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    category TEXT,
+    date TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_category_date ON events (category, date);
+CREATE INDEX IF NOT EXISTS events_date ON events (date);
+
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY,
+    date TEXT,
+    category TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS news_date ON news (date);
+CREATE INDEX IF NOT EXISTS news_category_date ON news (category, date);
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+
+-- Running per-day review aggregates, maintained by the trigger below
+CREATE TABLE IF NOT EXISTS review_days (
+    day TEXT PRIMARY KEY,
+    reviews INTEGER NOT NULL DEFAULT 0,
+    breakfast_sum REAL NOT NULL DEFAULT 0,
+    breakfast_count INTEGER NOT NULL DEFAULT 0,
+    lunch_sum REAL NOT NULL DEFAULT 0,
+    lunch_count INTEGER NOT NULL DEFAULT 0,
+    snacks_sum REAL NOT NULL DEFAULT 0,
+    snacks_count INTEGER NOT NULL DEFAULT 0,
+    dinner_sum REAL NOT NULL DEFAULT 0,
+    dinner_count INTEGER NOT NULL DEFAULT 0,
+    overall_sum REAL NOT NULL DEFAULT 0,
+    overall_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS reviews_aggregate AFTER INSERT ON reviews BEGIN
+    INSERT OR IGNORE INTO review_days (day) VALUES (COALESCE(substr(NEW.timestamp, 1, 10), ''));
+    UPDATE review_days SET
+        reviews = reviews + 1,
+        breakfast_sum = breakfast_sum + COALESCE(NEW.breakfast, 0),
+        breakfast_count = breakfast_count + (NEW.breakfast IS NOT NULL),
+        lunch_sum = lunch_sum + COALESCE(NEW.lunch, 0),
+        lunch_count = lunch_count + (NEW.lunch IS NOT NULL),
+        snacks_sum = snacks_sum + COALESCE(NEW.snacks, 0),
+        snacks_count = snacks_count + (NEW.snacks IS NOT NULL),
+        dinner_sum = dinner_sum + COALESCE(NEW.dinner, 0),
+        dinner_count = dinner_count + (NEW.dinner IS NOT NULL),
+        overall_sum = overall_sum + COALESCE(NEW.overall, 0),
+        overall_count = overall_count + (NEW.overall IS NOT NULL)
+    WHERE day = COALESCE(substr(NEW.timestamp, 1, 10), '');
+END;
+"""
+
+# Per-collection change counters, so caches can tell when a table changed
+VERSION_SCHEMA = "CREATE TABLE IF NOT EXISTS versions (collection TEXT PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0);\n" + "".join(
+    f"INSERT OR IGNORE INTO versions (collection) VALUES ('{collection}');\n"
+    + "".join(
+        f"CREATE TRIGGER IF NOT EXISTS {collection}_version_{event.lower()} AFTER {event} ON {collection} BEGIN "
+        f"UPDATE versions SET version = version + 1 WHERE collection = '{collection}'; END;\n"
+        for event in ('INSERT', 'UPDATE', 'DELETE'))
+    for collection in ('reviews', 'events', 'news', 'users'))
+
+# Rebuilds review_days for databases created before it existed
+BACKFILL_REVIEW_DAYS = """
+INSERT INTO review_days
+SELECT COALESCE(substr(timestamp, 1, 10), ''), COUNT(*),
+       COALESCE(SUM(breakfast), 0), COUNT(breakfast),
+       COALESCE(SUM(lunch), 0), COUNT(lunch),
+       COALESCE(SUM(snacks), 0), COUNT(snacks),
+       COALESCE(SUM(dinner), 0), COUNT(dinner),
+       COALESCE(SUM(overall), 0), COUNT(overall)
+FROM reviews GROUP BY 1
+"""
+
+# Indexed columns per table, pulled out of each record on insert
+COLUMNS = {
+    'reviews': ['user', 'timestamp'] + MEALS + ['overall'],
+    'events': ['category', 'date'],
+    'news': ['date', 'category'],
+    'users': ['username'],
+}
+
+# How many connections each process keeps open per database
+POOL_SIZE = 8
+# Seconds to wait for an idle connection once all of them are in use
+POOL_TIMEOUT = 30
+
+
+class _ConnectionPool:
+    """Bounded pool of connections to one database, shared by all sessions"""
+
+    def __init__(self, path: str, size: int = POOL_SIZE, timeout: float = POOL_TIMEOUT):
+        self.path = path
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._size = size
+        self._timeout = timeout
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self._size
+                if create:
+                    self._created += 1
+            if create:
+                conn = self._connect()
+            else:
+                try:
+                    conn = self._idle.get(timeout=self._timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"no free connection to {self.path} after {self._timeout}s "
+                        f"(all {self._size} in use)") from None
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+
+# One pool per (process, database); connections must not cross a fork.
+_pools: Dict[tuple, _ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def _pool(path: str) -> _ConnectionPool:
+    key = (os.getpid(), os.path.abspath(path))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = _ConnectionPool(path)
+        return _pools[key]
+
+
+class SQLiteStore:
+    """SQLite (WAL mode) backend with the same interface as JsonStore"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.file_path = db_path
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+            conn.executescript(VERSION_SCHEMA)
+            with conn:
+                if (conn.execute("SELECT 1 FROM review_days LIMIT 1").fetchone() is None
+                        and conn.execute("SELECT 1 FROM reviews LIMIT 1").fetchone() is not None):
+                    conn.execute(BACKFILL_REVIEW_DAYS)
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        with _pool(self.db_path).connection() as conn:
+            yield conn
+
+    def exists(self) -> bool:
+        """True once the database has been seeded or migrated into"""
+        with self._connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0] > 0
+
+    def _insert(self, conn: sqlite3.Connection, collection: str, records: List[Dict[str, Any]]):
+        columns = COLUMNS[collection]
+        placeholders = ', '.join('?' for _ in range(len(columns) + 1))
+        verb = 'INSERT OR IGNORE' if collection == 'users' else 'INSERT'
+        conn.executemany(
+            f"{verb} INTO {collection} ({', '.join(columns)}, doc) VALUES ({placeholders})",
+            ([record.get(column) for column in columns] + [json.dumps(record, ensure_ascii=False)]
+             for record in records))
+
+    def _docs(self, conn: sqlite3.Connection, sql: str, params=()) -> List[Dict]:
+        return [json.loads(row[0]) for row in conn.execute(sql, params)]
+
+    def load(self) -> Dict[str, List]:
+        with self._connection() as conn:
+            return self._load_all(conn)
+
+    def _load_all(self, conn: sqlite3.Connection) -> Dict[str, List]:
+        return {collection: self._docs(conn, f"SELECT doc FROM {collection} ORDER BY rowid")
+                for collection in COLUMNS}
+
+    def save(self, data: Dict[str, Any]):
+        """Replace the whole database contents with `data`"""
+        with self._connection() as conn:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                self._replace_all(conn, data)
+
+    def _replace_all(self, conn: sqlite3.Connection, data: Dict[str, Any]):
+        # The insert trigger rebuilds the aggregates from scratch
+        conn.execute("DELETE FROM review_days")
+        for collection in COLUMNS:
+            conn.execute(f"DELETE FROM {collection}")
+            self._insert(conn, collection, data.get(collection, []))
+        conn.execute("PRAGMA user_version = 1")
+
+    def update(self, mutate: Callable[[Dict[str, Any]], None]):
+        with self._connection() as conn:
+            with conn:
+                # Take the write lock before reading so nobody slips in between
+                conn.execute("BEGIN IMMEDIATE")
+                data = self._load_all(conn)
+                mutate(data)
+                self._replace_all(conn, data)
+
+    def append(self, collection: str, record: Dict[str, Any]):
+        with self._connection() as conn:
+            with conn:
+                self._insert(conn, collection, [record])
+
+    def extend(self, collection: str, records: List[Dict[str, Any]]):
+        with self._connection() as conn:
+            with conn:
+                self._insert(conn, collection, records)
+
+    def add_user_if_absent(self, user: Dict[str, Any]) -> bool:
+        with self._connection() as conn:
+            with conn:
+                before = conn.total_changes
+                self._insert(conn, 'users', [user])
+                return conn.total_changes > before
+
+    def get_user(self, username: str) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT doc FROM users WHERE username = ?", (username,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update_users(self, users: List[Dict[str, Any]]):
+        with self._connection() as conn:
+            with conn:
+                conn.executemany("UPDATE users SET doc = ? WHERE username = ?",
+                                 ((json.dumps(user, ensure_ascii=False), user['username']) for user in users))
+
+    def version(self, collection: Optional[str] = None) -> Tuple:
+        """Token that changes whenever the data (or just `collection`) changes"""
+        with self._connection() as conn:
+            if collection is not None:
+                row = conn.execute("SELECT version FROM versions WHERE collection = ?", (collection,)).fetchone()
+                return (self.db_path, row[0] if row else 0)
+            return (self.db_path,) + tuple(
+                row[0] for row in conn.execute("SELECT version FROM versions ORDER BY collection"))
+
+    # Queries
+
+    def records(self, collection: str) -> List[Dict]:
+        with self._connection() as conn:
+            return self._docs(conn, f"SELECT doc FROM {collection} ORDER BY rowid")
+
+    def review_columns(self) -> ReviewColumns:
+        return ReviewColumns.from_records(self.records('reviews'))
+
+    def recent(self, collection: str, limit: int) -> List[Dict]:
+        with self._connection() as conn:
+            docs = self._docs(conn, f"SELECT doc FROM {collection} ORDER BY rowid DESC LIMIT ?", (limit,))
+        return docs[::-1]
+
+    def count(self, collection: str, category: Any = None) -> int:
+        with self._connection() as conn:
+            if category is None:
+                return conn.execute(f"SELECT COUNT(*) FROM {collection}").fetchone()[0]
+            return conn.execute(f"SELECT COUNT(*) FROM {collection} WHERE category = ?",
+                                (category,)).fetchone()[0]
+
+    def page(self, collection: str, offset: int = 0, limit: Optional[int] = None,
+             category: Any = None) -> List[Dict]:
+        where, params = ("WHERE category = ?", (category,)) if category is not None else ("", ())
+        with self._connection() as conn:
+            return self._docs(conn, f"SELECT doc FROM {collection} {where} ORDER BY rowid LIMIT ? OFFSET ?",
+                              params + (-1 if limit is None else limit, offset))
+
+    def newest(self, collection: str, limit: Optional[int] = None,
+               before: Optional[Tuple[str, int]] = None) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        where, params = "", ()
+        if before is not None:
+            where = "WHERE ifnull(date, '') < ? OR (ifnull(date, '') = ? AND rowid > ?)"
+            params = (before[0], before[0], before[1])
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"SELECT rowid, date, doc FROM {collection} {where} ORDER BY date DESC, rowid LIMIT ?",
+                params + (-1 if limit is None else limit + 1,)).fetchall()
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1][1] or '', rows[-1][0])
+        return [json.loads(row[2]) for row in rows], next_cursor
+
+    def iter_reviews(self, since_day: Optional[str] = None, until_day: Optional[str] = None,
+                     user: Optional[str] = None, chunk_size: int = 5000) -> Iterator[List[Dict]]:
+        """Reviews in insertion order, filtered, fetched `chunk_size` rows at a time.
+
+        Each chunk is read with its own pooled connection, so a consumer
+        that stops between chunks does not hold one.
+        """
+        conditions, params = ["rowid > ?"], []
+        if since_day is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since_day)
+        if until_day is not None:
+            conditions.append("timestamp < ?")
+            params.append((datetime.strptime(until_day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d'))
+        if user is not None:
+            conditions.append("user = ?")
+            params.append(user)
+        query = f"SELECT rowid, doc FROM reviews WHERE {' AND '.join(conditions)} ORDER BY rowid LIMIT ?"
+        last_rowid = 0
+        while True:
+            with self._connection() as conn:
+                rows = conn.execute(query, [last_rowid] + params + [chunk_size]).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+            yield [json.loads(doc) for _, doc in rows]
+
+    def has_review_on(self, user_id: str, day: str) -> bool:
+        next_day = (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM reviews WHERE user = ? AND timestamp >= ? AND timestamp < ? LIMIT 1",
+                (user_id, day, next_day)).fetchone()
+        return row is not None
+
+    def rating_averages(self, since_day: str) -> Dict[str, float]:
+        fields = MEALS + ['overall']
+        with self._connection() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(f'SUM({field}_sum), SUM({field}_count)' for field in fields)} "
+                "FROM review_days WHERE day >= ?", (since_day,)).fetchone()
+        return {field: row[2 * i] / row[2 * i + 1] if row[2 * i + 1] else 0
+                for i, field in enumerate(fields)}
+
+    def review_stats(self, since_day: str) -> Dict[str, Any]:
+        with self._connection() as conn:
+            total, overall_sum = conn.execute(
+                "SELECT COALESCE(SUM(reviews), 0), COALESCE(SUM(overall_sum), 0) FROM review_days").fetchone()
+            recent = conn.execute(
+                "SELECT COALESCE(SUM(reviews), 0) FROM review_days WHERE day >= ?", (since_day,)).fetchone()[0]
+            # Walks the (user, timestamp) index rather than the table
+            users = conn.execute("SELECT COUNT(DISTINCT NULLIF(user, '')) FROM reviews").fetchone()[0]
+        return {
+            'total_reviews': total,
+            'active_users': users,
+            'recent_reviews': recent,
+            'avg_rating': overall_sum / total if total else 0
+        }
+
+
+def migrate_json_to_sqlite(json_path: str, db_path: str, force: bool = False) -> Dict[str, int]:
+    """Copy a JSON data file (snapshot plus journals) into a SQLite database.
+
+    Refuses to touch a database that already holds data unless `force` is set.
+    Returns the number of records migrated per collection.
+    """
+    from utils.json_store import JsonStore
+
+    data = JsonStore(json_path).load()
+    store = SQLiteStore(db_path)
+    if store.exists() and not force:
+        raise ValueError(f"{db_path} already contains data; pass force=True to overwrite it")
+    store.save(data)
+    return {collection: store.count(collection) for collection in COLUMNS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate KhollPoll JSON data into SQLite")
+    parser.add_argument('json_path', nargs='?', default='data/reviews.json')
+    parser.add_argument('db_path', nargs='?', default='data/reviews.db')
+    parser.add_argument('--force', action='store_true', help="overwrite a database that already has data")
+    args = parser.parse_args()
+
+    counts = migrate_json_to_sqlite(args.json_path, args.db_path, force=args.force)
+    for collection, count in counts.items():
+        print(f"{collection}: {count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Process-wide cache of static assets (stylesheets, inline images)
+
+Every rerun of every session used to re-read the logo from disk and
+base64 it, and re-read every stylesheet. Assets are now read, minified and
+encoded once per process and only re-read when the file on disk changes.
+The stylesheets are still sent to the browser as a <style> element on
+every rerun; only the server-side work is cached. Serving them once from
+./static behind a hashed URL does not work on every Streamlit version
+requirements.txt allows: 1.37's static serving sends only images with
+their own type and anything else as text/plain with nosniff, which
+browsers refuse to apply as a stylesheet.
+"""
+import base64
+import mimetypes
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+ASSET_DIR = 'assets'
+CSS_DIR = os.path.join(ASSET_DIR, 'css')
+
+_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cached(path: str, kind: str, build: Callable[[bytes], Any]) -> Any:
+    """build(file contents), memoized until the file's mtime or size changes"""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = (os.path.abspath(path), kind)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+    with open(path, 'rb') as f:
+        value = build(f.read())
+    with _cache_lock:
+        _cache[key] = (signature, value)
+    return value
+
+
+def image_base64(path: str) -> str:
+    return _cached(path, 'base64', lambda content: base64.b64encode(content).decode())
+
+
+def data_uri(path: str, size: Optional[Tuple[int, int]] = None) -> str:
+    """data: URI for embedding an image directly in markup, optionally
+    downscaled to `size` first so the markup stays small"""
+    if size is None:
+        mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        return f"data:{mime};base64,{image_base64(path)}"
+
+    from utils.thumbnails import get_thumbnail
+    encoded = _cached(path, f"base64:{size[0]}x{size[1]}",
+                      lambda content: base64.b64encode(get_thumbnail(path, size)).decode())
+    return f"data:image/png;base64,{encoded}"
+
+
+def _minify_css(css: str) -> str:
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    return re.sub(r'\s+', ' ', css).strip()
+
+
+def stylesheet(name: str) -> str:
+    """Minified contents of assets/css/<name>"""
+    return _cached(os.path.join(CSS_DIR, name), 'css', lambda content: _minify_css(content.decode('utf-8')))
+
+
+def style_tag(*names: str) -> str:
+    """One <style> element with the given stylesheets, in order"""
+    return '<style>' + '\n'.join(stylesheet(name) for name in names) + '</style>'
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,161 @@
+"""Pre-resized event poster thumbnails
+
+Posters are full-size images; decoding and resizing them on every rerun made
+the events page scale with poster resolution. Thumbnails are resized once,
+written to an on-disk cache keyed by source path, mtime, size and target
+dimensions, and the hottest ones are kept in memory as encoded PNG bytes.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+from PIL import Image
+
+THUMBNAIL_SIZE = (450, 300)  # Fixed size (width, height)
+CACHE_DIR = os.environ.get('KHOLLPOLL_THUMBNAIL_DIR', os.path.join('.cache', 'thumbnails'))
+MEMORY_ITEMS = 64
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_memory: 'OrderedDict[str, bytes]' = OrderedDict()
+_memory_lock = threading.Lock()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _cache_key(path: str, size: Tuple[int, int]) -> Optional[str]:
+    """Key for the current contents of `path`, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    source = f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}:{size[0]}x{size[1]}"
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+def _remember(key: str, thumbnail: bytes):
+    with _memory_lock:
+        _memory[key] = thumbnail
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ITEMS:
+            _memory.popitem(last=False)
+
+
+def _render(path: str, size: Tuple[int, int]) -> bytes:
+    with Image.open(path) as img:
+        if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            img = img.convert('RGB')
+        thumbnail = img.resize(size)
+    buffer = io.BytesIO()
+    thumbnail.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _write_cache_file(cache_path: str, thumbnail: bytes):
+    """Write atomically so concurrent renderers never serve a partial file"""
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(thumbnail)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as e:
+        print(f"Error caching thumbnail: {e}")
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.png")
+
+
+def _cached(key: str) -> Optional[bytes]:
+    """The thumbnail from memory or the disk cache, or None if not rendered yet"""
+    with _memory_lock:
+        thumbnail = _memory.get(key)
+        if thumbnail is not None:
+            _memory.move_to_end(key)
+            return thumbnail
+    try:
+        with open(_cache_path(key), 'rb') as f:
+            thumbnail = f.read()
+    except OSError:
+        return None
+    _remember(key, thumbnail)
+    return thumbnail
+
+
+def _render_cached(path: str, size: Tuple[int, int], key: str) -> bytes:
+    thumbnail = _render(path, size)
+    _write_cache_file(_cache_path(key), thumbnail)
+    _remember(key, thumbnail)
+    return thumbnail
+
+
+def get_thumbnail(path: str, size: Tuple[int, int] = THUMBNAIL_SIZE) -> Optional[bytes]:
+    """PNG bytes of `path` resized to `size`, or None if the poster is missing.
+
+    Raises whatever PIL raises if the poster cannot be decoded.
+    """
+    key = _cache_key(path, size)
+    if key is None:
+        return None
+    thumbnail = _cached(key)
+    if thumbnail is None:
+        thumbnail = _render_cached(path, size, key)
+    return thumbnail
+
+
+def _try_render(path: str, size: Tuple[int, int], key: str) -> Union[bytes, Exception]:
+    try:
+        return _render_cached(path, size, key)
+    except Exception as e:
+        return e
+
+
+def _pool() -> ThreadPoolExecutor:
+    """The pool shared by every session for cold posters, started on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='thumbnails')
+        return _executor
+
+
+def load_thumbnails(paths: List[str], size: Tuple[int, int] = THUMBNAIL_SIZE) -> List[Union[bytes, None, Exception]]:
+    """get_thumbnail() for every path, decoding cold posters in parallel.
+
+    Cached thumbnails are read inline; only posters that still need
+    rendering go to the pool (PIL releases the GIL while decoding and
+    resizing, so it scales with cores). Results are in the order of
+    `paths`; a poster that cannot be decoded yields its exception instead
+    of raising.
+    """
+    by_path: Dict[str, Union[bytes, None, Exception]] = {}
+    cold = []
+    for path in dict.fromkeys(paths):
+        key = _cache_key(path, size)
+        by_path[path] = None if key is None else _cached(key)
+        if key is not None and by_path[path] is None:
+            cold.append((path, key))
+
+    if len(cold) == 1 or MAX_WORKERS <= 1:
+        for path, key in cold:
+            by_path[path] = _try_render(path, size, key)
+    elif cold:
+        futures = [(path, _pool().submit(_try_render, path, size, key)) for path, key in cold]
+        for path, future in futures:
+            by_path[path] = future.result()
+    return [by_path[path] for path in paths]
+
+
+def clear_memory_cache():
+    with _memory_lock:
+        _memory.clear()